@@ -0,0 +1,54 @@
+import time
+import numpy as np
+import pandas as pd
+from sheetsift.report import transactions, aggregate, join_distinct, KEYS, YEAR, AMOUNT, PURPOSE
+
+ROWS = 200_000
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def pivot_merge(rows, keys):
+    table = rows.pivot_table(index=keys, columns=YEAR, values=AMOUNT, aggfunc='sum',
+                             fill_value=0, observed=True).div(100).reset_index()
+    reasons = rows.groupby(keys, observed=True)[PURPOSE].apply(
+        lambda x: ' ||\n'.join(sorted(set(x)))).reset_index()
+    return pd.merge(table, reasons, on=keys)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    party = pd.Series(rng.integers(0, 5_000, ROWS))
+    rows = transactions(
+        year=pd.Series(rng.choice([2021, 2022, 2023, 2024], ROWS), dtype='Int16'),
+        account=pd.Series(rng.choice(['LT01', 'LT02'], ROWS)).astype('category'),
+        counterparty=('Gavėjas ' + party.astype(str)).astype('category'),
+        counterparty_account=('LT' + party.astype(str)).astype('category'),
+        purpose=pd.Series(rng.choice([f'Paskirtis {i}' for i in range(50)], ROWS)),
+        amount=pd.Series(rng.integers(1, 100_000, ROWS), dtype='Int64'),
+    )
+    keys = [key for key in KEYS if key in rows]
+
+    old_time = timed(lambda: pivot_merge(rows, keys), repeat=1)
+    new_time = timed(lambda: aggregate(rows, keys))
+    print(f'{ROWS} rows')
+    print(f'pivot + groupby + merge {old_time * 1000:9.1f} ms   single pass {new_time * 1000:7.1f} ms'
+          f'   {old_time / new_time:6.1f}x')
+
+    codes = rows.groupby(keys, observed=True).ngroup().to_numpy()
+    old_time = timed(lambda: rows.groupby(keys, observed=True)[PURPOSE].apply(
+        lambda x: ' ||\n'.join(sorted(set(x)))), repeat=1)
+    new_time = timed(lambda: join_distinct(codes, rows[PURPOSE]))
+    print(f'purposes: sorted(set) per group {old_time * 1000:9.1f} ms   join_distinct {new_time * 1000:7.1f} ms'
+          f'   {old_time / new_time:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
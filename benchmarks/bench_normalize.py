@@ -0,0 +1,51 @@
+import time
+import numpy as np
+import pandas as pd
+from sheetsift.normalize import signed_indicator, split_signed
+
+ROWS = 200_000
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def row_wise_indicator(df):
+    credit = df.apply(lambda x: x['OFS.AMOUNT'] if x['SIGN'] == 'CR' else 0, axis=1)
+    debit = df.apply(lambda x: abs(x['OFS.AMOUNT']) if x['SIGN'] == 'DR' else 0, axis=1)
+    return credit, debit
+
+
+def row_wise_signed(df):
+    return df['Amount'].apply(lambda x: x if x > 0 else 0), df['Amount'].apply(lambda x: -x if x < 0 else 0)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'OFS.AMOUNT': rng.uniform(0, 1000, ROWS).round(2),
+        'SIGN': pd.Categorical(rng.choice(['CR', 'DR'], ROWS)),
+        'Amount': rng.uniform(-1000, 1000, ROWS).round(2),
+    })
+
+    cases = [
+        ('CR/DR indicator', lambda: row_wise_indicator(df),
+         lambda: split_signed(signed_indicator(df['OFS.AMOUNT'], df['SIGN'], 'CR', 'DR'))),
+        ('signed amount', lambda: row_wise_signed(df), lambda: split_signed(df['Amount'])),
+    ]
+
+    print(f'{ROWS} rows')
+    for name, old, new in cases:
+        old_time = timed(old, repeat=1)
+        new_time = timed(new)
+        print(f'{name:<16} row-wise {old_time * 1000:9.1f} ms   vectorized {new_time * 1000:7.1f} ms'
+              f'   {old_time / new_time:6.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import time
+import numpy as np
+import pandas as pd
+from sheetsift.normalize import split_signed
+from sheetsift.report import transactions, _side, _summary, CREDIT_NAMES, DEBIT_NAMES, ACCOUNT, YEAR, AMOUNT
+
+ROWS = 200_000
+ACCOUNTS = 60
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_account(frame, credit, debit):
+    years = [int(y) for y in sorted(frame[YEAR].dropna().unique())]
+    rows = []
+    for account in frame[ACCOUNT].dropna().unique():
+        for label, side in (('Bendros Pajamos', credit[credit[ACCOUNT] == account]),
+                            ('Bendros Išlaidos', debit[debit[ACCOUNT] == account])):
+            totals = side.groupby(YEAR)[AMOUNT].sum() / 100
+            row = [totals.get(year, 0) for year in years]
+            rows.append(pd.DataFrame([row + [sum(row)]], columns=years + ['Viso'], index=[f'{account} {label}']))
+    return pd.concat(rows)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    frame = transactions(
+        year=pd.Series(rng.choice([2021, 2022, 2023, 2024], ROWS), dtype='Int16'),
+        account=pd.Series(rng.choice([f'LT{i:02}' for i in range(ACCOUNTS)], ROWS)).astype('category'),
+        counterparty=pd.Series(rng.choice(['Jonas', 'Petras'], ROWS)).astype('category'),
+        amount=pd.Series(rng.integers(-100_000, 100_000, ROWS), dtype='Int64'),
+    )
+    credit_amounts, debit_amounts = split_signed(frame[AMOUNT])
+    credit, _ = _side(frame, credit_amounts, CREDIT_NAMES)
+    debit, _ = _side(frame, debit_amounts, DEBIT_NAMES)
+
+    old_time = timed(lambda: per_account(frame, credit, debit), repeat=1)
+    new_time = timed(lambda: _summary(frame, credit, debit))
+    print(f'{ROWS} rows, {ACCOUNTS} accounts')
+    print(f'loop per account {old_time * 1000:9.1f} ms   grouped {new_time * 1000:7.1f} ms'
+          f'   {old_time / new_time:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sheetsift.reader import read_statement
+
+FILES = 8
+ROWS = 20_000
+
+
+def statement(rng):
+    df = pd.DataFrame({
+        'Data': pd.date_range('2024-01-01', periods=ROWS, freq='20min').strftime('%Y-%m-%d'),
+        'Gavėjas / Siuntėjas': rng.choice([f'Gavėjas {i}' for i in range(500)], ROWS),
+        'Operacijos tipas': rng.choice(['įplaukos', 'išlaidos'], ROWS),
+        'Suma': rng.uniform(1, 1000, ROWS).round(2),
+    })
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def main():
+    rng = np.random.default_rng(0)
+    uploads = [statement(rng) for _ in range(FILES)]
+
+    start = time.perf_counter()
+    for data in uploads:
+        read_statement(io.BytesIO(data))
+    one_by_one = time.perf_counter() - start
+
+    workers = os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Workers are started before timing, as the app's pool would be
+        list(pool.map(read_statement, [io.BytesIO(uploads[0])] * workers))
+        start = time.perf_counter()
+        list(pool.map(read_statement, [io.BytesIO(data) for data in uploads]))
+        pooled = time.perf_counter() - start
+
+    print(f'{FILES} statements of {ROWS} rows, {workers} workers')
+    print(f'one by one {one_by_one * 1000:9.1f} ms   worker pool {pooled * 1000:9.1f} ms'
+          f'   {one_by_one / pooled:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sheetsift.report import transactions, write_report
+
+ROWS = 100_000
+
+
+def measured(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    rng = np.random.default_rng(0)
+    party = pd.Series(rng.integers(0, ROWS // 2, ROWS))
+    frame = transactions(
+        year=pd.Series(rng.choice([2021, 2022, 2023, 2024], ROWS), dtype='Int16'),
+        counterparty='Gavėjas ' + party.astype(str),
+        counterparty_account='LT' + party.astype(str),
+        purpose=pd.Series(rng.choice([f'Paskirtis {i}' for i in range(50)], ROWS)),
+        amount=pd.Series(rng.integers(-100_000, 100_000, ROWS), dtype='Int64'),
+    )
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'ataskaita.xlsx')
+        print(f'{ROWS} transactions')
+        for name, streaming in (('to_excel', False), ('streaming', True)):
+            elapsed, peak = measured(lambda: write_report(path, frame, streaming=streaming))
+            print(f'{name:<10} {elapsed * 1000:9.1f} ms   peak {peak / 2 ** 20:7.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,9 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 config = {
     'UPLOAD_FOLDER': os.path.join(BASE_DIR, 'uploads'),
     'RESULT_FOLDER': os.path.join(BASE_DIR, 'results'),
+    'PARSE_CACHE_FOLDER': os.path.join(BASE_DIR, 'cache', 'statements'),
+    'RESULT_CACHE_FOLDER': os.path.join(BASE_DIR, 'cache', 'results'),
+    'PARSE_WORKERS': os.cpu_count(),
     'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(BASE_DIR, 'app.db'),
     'SQLALCHEMY_TRACK_MODIFICATIONS': False
 }
@@ -24,9 +24,18 @@ def create_app(config=None, testing=False):
     app = Flask(__name__)
     app.secret_key = 'secret_key*#'
 
+    from .uploads import SpooledRequest
+    app.request_class = SpooledRequest
+
     if config:
         app.config.update(config)
 
+    from .cache import init_caches
+    init_caches(app)
+
+    from .uploads import init_parse_pool
+    init_parse_pool(app)
+
     db.init_app(app)
     login_manager.init_app(app)
     bcrypt.init_app(app)
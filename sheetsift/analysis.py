@@ -0,0 +1,71 @@
+import os
+import shutil
+import uuid
+from flask import request, redirect, url_for, current_app, session
+from sheetsift.utils import schedule_file_deletion
+from sheetsift.reader import sniff_format
+from sheetsift.cache import load_statement, load_result, store_result
+from sheetsift.specs import compile_specs, build_transactions
+from sheetsift.report import write_report, output_name, combine_transactions
+from sheetsift.uploads import uploaded_files, map_uploads
+
+
+def report_options():
+    # The report choices of the upload form, in the order the result cache
+    # keys them. A purposes count below 1 keeps them all, like no count.
+    purposes = request.form.get('purposes', type=int)
+    if purposes is not None and purposes < 1:
+        purposes = None
+    return request.form.get('granularity', 'year'), request.form.get('output', 'xlsx'), purposes
+
+
+def run_analysis(files, bank, variants, specs, result_name, build):
+    # The request handling every upload shares: an identical earlier request
+    # is answered from the result cache, otherwise `build()` gives the
+    # transactions to report. `variants` names the format of each file and
+    # `specs` are the SPECS they were read with.
+    #
+    # Every request writes into a folder of its own, so a concurrent request
+    # can neither replace the result before it is downloaded nor have its
+    # deletion timer remove it.
+    granularity, output, purposes = options = report_options()
+    folder = os.path.join(current_app.config['RESULT_FOLDER'], uuid.uuid4().hex)
+    try:
+        os.makedirs(folder)
+        result_path = os.path.join(folder, output_name(result_name, output))
+        if not load_result(files, bank, variants, specs, result_path, options):
+            write_report(result_path, build(), granularity, output=output, purposes=purposes)
+            store_result(files, bank, variants, specs, result_path, options)
+        schedule_file_deletion(result_path, delay=60, remove_folder=True)
+
+        session['last_file'] = result_path
+        return redirect(url_for('main.sekmingai'))
+
+    except Exception as e:
+        print(f"Klaida: {e}")
+        shutil.rmtree(folder, ignore_errors=True)
+        return redirect(url_for('main.klaida'))
+
+
+def analyze_bank(bank, specs, result_name):
+    # Statements of one bank, each read with the spec its header matches
+    files = uploaded_files()
+    if not files or not all(file and file.filename.endswith('.xlsx') for file in files):
+        return redirect(url_for('main.klaida'))
+
+    formats, dtypes = compile_specs(specs)
+    try:
+        selections = [sniff_format(file.stream, formats) for file in files]
+    except Exception as e:
+        print(f"Klaida: {e}")
+        return redirect(url_for('main.klaida'))
+    if None in selections:
+        return redirect(url_for('main.klaida'))
+
+    def build():
+        frames = map_uploads(load_statement, [(file, bank, selection, formats[selection], dtypes, len(files) > 1)
+                                              for file, selection in zip(files, selections)])
+        return combine_transactions([build_transactions(specs[selection], df)
+                                     for selection, df in zip(selections, frames)])
+
+    return run_analysis(files, bank, selections, specs, result_name, build)
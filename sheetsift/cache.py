@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import pandas as pd
+from flask import current_app
+from sheetsift.reader import read_statement
+from sheetsift.uploads import upload_digest, run_in_pool, spilled
+
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Part of every parsed statement's key, with the pandas version that
+# pickled it; bump it when a change to the reader changes the frames
+PARSE_CACHE_VERSION = 1
+# Part of every result key; bump it when a change to the report code
+# changes what an upload produces
+RESULT_CACHE_VERSION = 1
+
+
+class FileCache:
+    # A folder of files keyed by a hash of the key parts, evicted least
+    # recently used first once the folder grows past `max_bytes`. Entries are
+    # written to a temporary file and renamed into place, so a reader never
+    # sees a half-written entry, and a hit refreshes the entry's mtime, which
+    # is what eviction orders by. An entry `read` fails on is removed and
+    # counts as a miss.
+    def __init__(self, folder, max_bytes, suffix=''):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, *parts):
+        key = hashlib.sha256('\0'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+        return os.path.join(self.folder, key + self.suffix)
+
+    def load(self, parts, read):
+        path = self.path(*parts)
+        try:
+            os.utime(path)
+            return read(path)
+        except FileNotFoundError:
+            # Missing, or evicted by another request between the two calls
+            return None
+        except Exception as e:
+            # Corrupt on disk, or pickled by a pandas that cannot read it back
+            print(f"Nepavyko nuskaityti talpyklos įrašo {path}: {e}")
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+
+    def store(self, parts, write):
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, self.path(*parts))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.folder):
+                if entry.name.endswith(self.suffix) and not entry.name.endswith('.tmp'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+def init_caches(app):
+    folder = app.config.get('PARSE_CACHE_FOLDER')
+    if folder:
+        max_bytes = app.config.get('PARSE_CACHE_MAX_BYTES', PARSE_CACHE_MAX_BYTES)
+        app.extensions['parse_cache'] = FileCache(folder, max_bytes, '.pkl')
+
+    folder = app.config.get('RESULT_CACHE_FOLDER')
+    if folder:
+        max_bytes = app.config.get('RESULT_CACHE_MAX_BYTES', RESULT_CACHE_MAX_BYTES)
+        # Results are workbooks or zip archives, so entries carry no suffix
+        app.extensions['result_cache'] = FileCache(folder, max_bytes)
+
+
+def _read(file, columns, dtypes, parallel):
+    # With a parse pool (PARSE_WORKERS) and several uploads (`parallel`) each
+    # sheet is parsed in a worker process, from the upload spilled to disk,
+    # so they parse side by side instead of taking turns on the GIL. A
+    # single upload is parsed here, straight from its stream.
+    if not parallel or 'parse_pool' not in current_app.extensions:
+        return read_statement(file.stream, columns=columns, dtypes=dtypes)
+    with spilled(file) as path:
+        return run_in_pool(read_statement, path, columns=columns, dtypes=dtypes)
+
+
+def load_statement(file, bank, variant, columns, dtypes=None, parallel=False):
+    # Re-uploads of the same statement are served from the parse cache,
+    # keyed on the upload's content hash and the format it was read as
+    cache = current_app.extensions.get('parse_cache')
+    if cache is None:
+        return _read(file, columns, dtypes, parallel)
+
+    parts = (PARSE_CACHE_VERSION, pd.__version__, upload_digest(file), bank, variant, *columns,
+             *sorted((dtypes or {}).items()))
+    df = cache.load(parts, pd.read_pickle)
+    if df is None:
+        df = _read(file, columns, dtypes, parallel)
+        cache.store(parts, df.to_pickle)
+    return df
+
+
+def spec_fingerprint(specs):
+    # SPECS written out in full, compiled patterns as their text and flags
+    # (their repr is cut short for long patterns), so any edit to a bank's
+    # SPECS gives its results new keys
+    text = json.dumps(specs, sort_keys=True, default=lambda pattern: [pattern.pattern, pattern.flags])
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _result_parts(files, bank, variants, specs, options):
+    # One key for the whole set of uploads, whatever order they came in
+    uploads = sorted(f'{upload_digest(file)}:{variant}' for file, variant in zip(files, variants))
+    return (RESULT_CACHE_VERSION, bank, spec_fingerprint(specs), *uploads, *options)
+
+
+def load_result(files, bank, variants, specs, result_path, options=()):
+    cache = current_app.extensions.get('result_cache')
+    if cache is None:
+        return False
+    parts = _result_parts(files, bank, variants, specs, options)
+    # `result_path` is private to the request, so a plain copy is enough
+    return cache.load(parts, lambda path: shutil.copyfile(path, result_path)) is not None
+
+
+def store_result(files, bank, variants, specs, result_path, options=()):
+    cache = current_app.extensions.get('result_cache')
+    if cache is not None:
+        parts = _result_parts(files, bank, variants, specs, options)
+        cache.store(parts, lambda path: shutil.copyfile(result_path, path))
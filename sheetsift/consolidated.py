@@ -0,0 +1,41 @@
+from flask import redirect, url_for
+from sheetsift.cache import load_statement
+from sheetsift.specs import build_transactions
+from sheetsift.report import combine_transactions, merge_banks
+from sheetsift.analysis import run_analysis
+from sheetsift.uploads import map_uploads
+from sheetsift.filters import seb, swedbank, luminor, citadele, paysera, revolut, siauliu
+
+# Every bank's statements go through that bank's own SPECS; the name labels
+# its own accounts when the statements do not
+BANKS = {
+    'seb': ('SEB', seb),
+    'swedbank': ('Swedbank', swedbank),
+    'luminor': ('Luminor', luminor),
+    'citadele': ('Citadele', citadele),
+    'paysera': ('Paysera', paysera),
+    'revolut': ('Revolut', revolut),
+    'siauliubankas': ('Artea', siauliu),
+}
+
+
+def analyze_banks(files, detected):
+    # Statements of several banks, `detected` holding the (bank, variant) of
+    # each file, in one report
+    if not all(file.filename.endswith('.xlsx') for file in files):
+        return redirect(url_for('main.klaida'))
+
+    def build():
+        frames = map_uploads(load_statement, [
+            (file, bank, variant, BANKS[bank][1].FORMATS[variant], BANKS[bank][1].DTYPES, len(files) > 1)
+            for file, (bank, variant) in zip(files, detected)])
+
+        by_bank = {}
+        for (bank, variant), df in zip(detected, frames):
+            name, module = BANKS[bank]
+            by_bank.setdefault(name, []).append(build_transactions(module.SPECS[variant], df))
+        return merge_banks({name: combine_transactions(bank_frames) for name, bank_frames in by_bank.items()})
+
+    variants = [f'{bank}/{variant}' for bank, variant in detected]
+    specs = {bank: BANKS[bank][1].SPECS for bank in sorted({bank for bank, _ in detected})}
+    return run_analysis(files, 'visi', variants, specs, 'Apdoroti_Israsai_Visi_Bankai.xlsx', build)
@@ -0,0 +1,44 @@
+from sheetsift.reader import read_statement
+
+
+def build_index(banks):
+    # Inverted index: header column -> every (bank, variant) whose required
+    # columns include it. Detection then only touches the formats that share
+    # a column with the uploaded header, however many banks are registered.
+    signatures = []
+    by_column = {}
+    for bank, formats in banks.items():
+        for variant, columns in formats.items():
+            required = frozenset(columns)
+            signatures.append((bank, variant, len(required)))
+            for column in required:
+                by_column.setdefault(column, []).append(len(signatures) - 1)
+    return signatures, by_column
+
+
+def detect_format(header, index):
+    signatures, by_column = index
+    hits = {}
+    for column in set(header):
+        for signature in by_column.get(column, ()):
+            hits[signature] = hits.get(signature, 0) + 1
+
+    # The most specific complete match wins, so a format whose columns are a
+    # superset of another's is never shadowed by it; ties go to the format
+    # registered first
+    best = None
+    for signature, count in hits.items():
+        size = signatures[signature][2]
+        if count == size and (best is None or size > signatures[best][2]
+                              or (size == signatures[best][2] and signature < best)):
+            best = signature
+
+    if best is None:
+        return None
+    bank, variant, _ = signatures[best]
+    return bank, variant
+
+
+def detect_bank(source, index):
+    header = read_statement(source, nrows=0).columns
+    return detect_format(header, index)
@@ -1,250 +1,41 @@
-import pandas as pd
-import numpy as np
-import os
 import re
-from flask import request, redirect, url_for, current_app, session
-from sheetsift.utils import schedule_file_deletion
+from sheetsift.specs import compile_specs
+from sheetsift.analysis import analyze_bank
+
+ACCOUNT_PATTERN = re.compile(r'(?P<account>LT\d{18})')
+NAME_PATTERN = re.compile(r'LT\d{18}\s+(?P<name>.*?)(?=\s+\d{6,}|\s+BIC:| dok\.Nr\.|$)')
+
+SPECS = {
+    'en_account': {
+        'date': 'Date',
+        'account': {'column': 'Account Nr'},
+        'counterparty': {'column': 'Correspondent', 'fill': 'Nenurodytas'},
+        'purpose': {'column': 'Details', 'fill': 'Be paskirties'},
+        'amount': {'credit': 'Credit in transaction currency', 'debit': 'Debit in transaction currency'},
+    },
+    'en_iban': {
+        'date': 'OFS.DATE',
+        'account': {'column': 'IBAN'},
+        'counterparty': {'column': 'OFS.CNP.NAME', 'fill': 'Nenurodytas'},
+        'counterparty_account': {'column': 'OFS.CNP.ACCT', 'fill': 'Sąskaita nenurodyta'},
+        'purpose': {'column': 'OFS.NARRATIVE', 'fill': 'Be paskirties'},
+        'amount': {'indicator': 'SIGN', 'amount': 'OFS.AMOUNT', 'credit': 'CR', 'debit': 'DR'},
+    },
+    'lt': {
+        # The counterparty's account and name follow the operation number
+        # in one text column
+        'date': 'Data',
+        'dayfirst': True,
+        'counterparty': {'column': 'Operacijos numeris ir paskirtis', 'pattern': NAME_PATTERN, 'group': 'name',
+                         'fill': 'Nenurodytas'},
+        'counterparty_account': {'column': 'Operacijos numeris ir paskirtis', 'pattern': ACCOUNT_PATTERN,
+                                 'group': 'account', 'fill': 'Sąskaita nerasta'},
+        'purpose': {'column': 'Operacijos numeris ir paskirtis', 'fill': 'Be paskirties'},
+        'amount': {'credit': 'CR', 'debit': 'DR'},
+    },
+}
+
+FORMATS, DTYPES = compile_specs(SPECS)
 
 def analyze_citadele():
-    file = request.files['file']
-    if file and file.filename.endswith('.xlsx'):
-        try:
-            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], file.filename)
-            file.save(filepath)
-
-            df = pd.read_excel(filepath)
-            columns = df.columns
-
-            selection = None
-
-            if 'Account Nr' and 'Correspondent' and 'Details' in columns:
-                selection = 'en_account'
-                df["METAI"] = pd.to_datetime(df["Date"], errors="coerce").dt.year
-                df['ASMENS SĄSKAITA'] = df['Account Nr']
-                df['MOKĖTOJAS/GAVĖJAS'] = df['Correspondent'].fillna('Nenurodytas')
-                df['MOKĖJIMO PASKIRTIS'] = df['Details'].fillna('Be paskirties')
-                df['PAJAMOS'] = df['Credit in transaction currency'].fillna(0)
-                df['IŠLAIDOS'] = df['Debit in transaction currency'].fillna(0)
-                df = df[['METAI', 'ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS', 'MOKĖJIMO PASKIRTIS', 'PAJAMOS', 'IŠLAIDOS']]
-
-            elif 'IBAN' and 'OFS.AMOUNT' and 'OFS.NARRATIVE' in columns:
-                selection = 'en_iban'
-                df["METAI"] = pd.to_datetime(df["OFS.DATE"].astype(str), format='%Y%m%d', errors='coerce').dt.year
-                df['ASMENS SĄSKAITA'] = df['IBAN']
-                df['MOKĖTOJAS/GAVĖJAS'] = df['OFS.CNP.NAME'].fillna('Nenurodytas')
-                df['MOKĖTOJO/GAVĖJO SĄSKAITA'] = df['OFS.CNP.ACCT'].fillna('Sąskaita nenurodyta')
-                df['MOKĖJIMO PASKIRTIS'] = df['OFS.NARRATIVE'].fillna('Be paskirties')
-                df['PAJAMOS'] = df.apply(lambda x: x['OFS.AMOUNT'] if x['SIGN'] == 'CR' else 0, axis=1)
-                df['IŠLAIDOS'] = df.apply(lambda x: abs(x['OFS.AMOUNT']) if x['SIGN'] == 'DR' else 0, axis=1)
-                df = df[['METAI', 'ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA', 'MOKĖJIMO PASKIRTIS', 'PAJAMOS', 'IŠLAIDOS']]
-
-            elif 'Data' and 'DR' and 'CR' in columns:
-                selection = 'lt'
-
-                def fix_date(x):
-                    if pd.isna(x):
-                        return np.nan
-                    try:
-                        return pd.to_datetime(x, dayfirst=True, errors='raise')
-                    except:
-                        try:
-                            return pd.to_datetime(float(x), origin='1899-12-30', unit='D')
-                        except:
-                            return np.nan
-
-                df['Data_converted'] = df['Data'].apply(fix_date)
-                df['METAI'] = df['Data_converted'].dt.year
-
-                df['MOKĖJIMO PASKIRTIS'] = df['Operacijos numeris ir paskirtis'].fillna('Be paskirties')
-                df['MOKĖTOJO/GAVĖJO SĄSKAITA'] = df['Operacijos numeris ir paskirtis'].str.extract(r'(LT\d{18})')
-
-                def extract_name(text):
-                    match = re.search(r'LT\d{18}\s+(.*?)(?=\s+\d{6,}|\s+BIC:| dok\.Nr\.|$)', str(text))
-                    if match:
-                        return match.group(1).strip()
-                    return 'Nenurodytas'
-
-                df['MOKĖTOJAS/GAVĖJAS'] = df['Operacijos numeris ir paskirtis'].apply(extract_name)
-                df['MOKĖTOJO/GAVĖJO SĄSKAITA'] = df['MOKĖTOJO/GAVĖJO SĄSKAITA'].fillna('Sąskaita nerasta')
-                df['DR'] = pd.to_numeric(df['DR'], errors='coerce').fillna(0)
-                df['CR'] = pd.to_numeric(df['CR'], errors='coerce').fillna(0)
-                df['PAJAMOS'] = df['CR']
-                df['IŠLAIDOS'] = df['DR'].abs()
-
-            else:
-                return redirect(url_for('main.klaida'))
-
-            if selection == 'en_account':
-
-                credit_df = df[df['PAJAMOS'] > 0]
-                debit_df = df[df['IŠLAIDOS'] > 0]
-
-                credit_pivot = credit_df.pivot_table(
-                    index=['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS'],
-                    columns='METAI', values='PAJAMOS', aggfunc='sum', fill_value=0).reset_index()
-
-                credit_reasons = credit_df.groupby(['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS'])['MOKĖJIMO PASKIRTIS'] \
-                    .apply(lambda x: ' ||\n'.join(sorted(set(x)))).reset_index()
-
-                credit_final = pd.merge(credit_pivot, credit_reasons, on=['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS'])
-                credit_final = credit_final.rename(columns={'MOKĖTOJAS/GAVĖJAS': 'MOKĖTOJAS'})
-
-                debit_pivot = debit_df.pivot_table(
-                    index=['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS'],
-                    columns='METAI', values='IŠLAIDOS', aggfunc='sum', fill_value=0).reset_index()
-
-                debit_reasons = debit_df.groupby(['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS'])['MOKĖJIMO PASKIRTIS'] \
-                    .apply(lambda x: ' ||\n'.join(sorted(set(x)))).reset_index()
-
-                debit_final = pd.merge(debit_pivot, debit_reasons, on=['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS'])
-                debit_final = debit_final.rename(columns={'MOKĖTOJAS/GAVĖJAS': 'GAVĖJAS'})
-
-                all_years = sorted(df['METAI'].dropna().unique())
-                all_years = [int(y) for y in all_years]
-
-                summary_list = []
-
-                for account in df['ASMENS SĄSKAITA'].dropna().unique():
-                    account_credit = credit_df[credit_df['ASMENS SĄSKAITA'] == account]
-                    account_debit = debit_df[debit_df['ASMENS SĄSKAITA'] == account]
-
-                    credit_summary = account_credit.groupby('METAI')['PAJAMOS'].sum()
-                    debit_summary = account_debit.groupby('METAI')['IŠLAIDOS'].sum()
-
-                    credit_row = [credit_summary.get(year, 0) for year in all_years]
-                    debit_row = [debit_summary.get(year, 0) for year in all_years]
-
-                    credit_total = sum(credit_row)
-                    debit_total = sum(debit_row)
-
-                    credit_df_row = pd.DataFrame([credit_row + [credit_total]], columns=all_years + ['Viso'],
-                                                 index=[f'{account} Bendros Pajamos'])
-                    debit_df_row = pd.DataFrame([debit_row + [debit_total]], columns=all_years + ['Viso'],
-                                                index=[f'{account} Bendros Išlaidos'])
-
-                    summary_list.append(credit_df_row)
-                    summary_list.append(debit_df_row)
-
-                summary_combined = pd.concat(summary_list)
-
-            elif selection == 'en_iban':
-
-                credit_df = df[df['PAJAMOS'] > 0]
-                debit_df = df[df['IŠLAIDOS'] > 0]
-
-                credit_pivot = credit_df.pivot_table(
-                    index=['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'],
-                    columns='METAI', values='PAJAMOS', aggfunc='sum', fill_value=0).reset_index()
-
-                credit_reasons = credit_df.groupby(['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'])['MOKĖJIMO PASKIRTIS'] \
-                    .apply(lambda x: ' ||\n'.join(sorted(set(x)))).reset_index()
-
-                credit_final = pd.merge(credit_pivot, credit_reasons, on=['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'])
-                credit_final = credit_final.rename(columns={'MOKĖTOJAS/GAVĖJAS': 'MOKĖTOJAS',
-                                                            'MOKĖTOJO/GAVĖJO SĄSKAITA': 'MOKĖTOJO SĄSKAITA'})
-
-                debit_pivot = debit_df.pivot_table(
-                    index=['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'],
-                    columns='METAI', values='IŠLAIDOS', aggfunc='sum', fill_value=0).reset_index()
-
-                debit_reasons = debit_df.groupby(['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'])['MOKĖJIMO PASKIRTIS'] \
-                    .apply(lambda x: ' ||\n'.join(sorted(set(x)))).reset_index()
-
-                debit_final = pd.merge(debit_pivot, debit_reasons, on=['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'])
-                debit_final = debit_final.rename(columns={'MOKĖTOJAS/GAVĖJAS': 'GAVĖJAS',
-                                                          'MOKĖTOJO/GAVĖJO SĄSKAITA': 'GAVĖJO SĄSKAITA'})
-
-                all_years = sorted(df['METAI'].dropna().unique())
-                all_years = [int(y) for y in all_years]
-
-                summary_list = []
-
-                for account in df['ASMENS SĄSKAITA'].dropna().unique():
-                    account_credit = credit_df[credit_df['ASMENS SĄSKAITA'] == account]
-                    account_debit = debit_df[debit_df['ASMENS SĄSKAITA'] == account]
-
-                    credit_summary = account_credit.groupby('METAI')['PAJAMOS'].sum()
-                    debit_summary = account_debit.groupby('METAI')['IŠLAIDOS'].sum()
-
-                    credit_row = [credit_summary.get(year, 0) for year in all_years]
-                    debit_row = [debit_summary.get(year, 0) for year in all_years]
-
-                    credit_total = sum(credit_row)
-                    debit_total = sum(debit_row)
-
-                    credit_df_row = pd.DataFrame([credit_row + [credit_total]], columns=all_years + ['Viso'],
-                                                 index=[f'{account} Bendros Pajamos'])
-                    debit_df_row = pd.DataFrame([debit_row + [debit_total]], columns=all_years + ['Viso'],
-                                                index=[f'{account} Bendros Išlaidos'])
-
-                    summary_list.append(credit_df_row)
-                    summary_list.append(debit_df_row)
-
-                summary_combined = pd.concat(summary_list)
-
-            elif selection == 'lt':
-
-                credit_df = df[df['PAJAMOS'] > 0]
-                debit_df = df[df['IŠLAIDOS'] > 0]
-
-                credit_pivot = credit_df.pivot_table(
-                    index=['MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'],
-                    columns='METAI', values='PAJAMOS', aggfunc='sum', fill_value=0).reset_index()
-
-                credit_reasons = credit_df.groupby(['MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'])['MOKĖJIMO PASKIRTIS'] \
-                    .apply(lambda x: ' ||\n'.join(sorted(set(x)))).reset_index()
-
-                credit_final = pd.merge(credit_pivot, credit_reasons, on=['MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'])
-                credit_final = credit_final.rename(columns={'MOKĖTOJO/GAVĖJO SĄSKAITA': 'MOKĖTOJO SĄSKAITA',
-                                                            'MOKĖTOJAS/GAVĖJAS': 'MOKĖTOJAS'})
-
-                debit_pivot = debit_df.pivot_table(
-                    index=['MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'],
-                    columns='METAI', values='IŠLAIDOS', aggfunc='sum', fill_value=0).reset_index()
-
-                debit_reasons = debit_df.groupby(['MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'])['MOKĖJIMO PASKIRTIS'] \
-                    .apply(lambda x: ' ||\n'.join(sorted(set(x)))).reset_index()
-
-                debit_final = pd.merge(debit_pivot, debit_reasons, on=['MOKĖTOJAS/GAVĖJAS', 'MOKĖTOJO/GAVĖJO SĄSKAITA'])
-                debit_final = debit_final.rename(columns={'MOKĖTOJO/GAVĖJO SĄSKAITA': 'GAVĖJO SĄSKAITA',
-                                                          'MOKĖTOJAS/GAVĖJAS': 'GAVĖJAS'})
-
-                all_years = sorted(df['METAI'].dropna().unique())
-                all_years = [int(y) for y in all_years]
-
-                credit_summary = credit_df.groupby('METAI')['PAJAMOS'].sum()
-                debit_summary = debit_df.groupby('METAI')['IŠLAIDOS'].sum()
-
-                credit_row = [credit_summary.get(year, 0) for year in all_years]
-                debit_row = [debit_summary.get(year, 0) for year in all_years]
-
-                credit_total = sum(credit_row)
-                debit_total = sum(debit_row)
-
-                credit_df_row = pd.DataFrame(
-                    [credit_row + [credit_total]], columns=all_years + ['Viso'], index=['Bendros Pajamos'])
-
-                debit_df_row = pd.DataFrame(
-                    [debit_row + [debit_total]], columns=all_years + ['Viso'], index=['Bendros Išlaidos'])
-
-                summary_combined = pd.concat([credit_df_row, debit_df_row])
-
-            else:
-                return redirect(url_for('main.klaida'))
-
-            result_path = os.path.join(current_app.config['RESULT_FOLDER'], 'Apdoroti_Išrasai_Citadele.xlsx')
-            with pd.ExcelWriter(result_path, engine='xlsxwriter') as writer:
-                credit_final.to_excel(writer, sheet_name='Pajamos', index=False)
-                debit_final.to_excel(writer, sheet_name='Išlaidos', index=False)
-                summary_combined.to_excel(writer, sheet_name='Bendra')
-
-            schedule_file_deletion(result_path, delay=60)
-
-            session['last_file'] = result_path
-            return redirect(url_for('main.sekmingai'))
-
-        except Exception as e:
-            print(f"Klaida: {e}")
-            return redirect(url_for('main.klaida'))
-
-    return redirect(url_for('main.klaida'))
\ No newline at end of file
+    return analyze_bank('citadele', SPECS, 'Apdoroti_Išrasai_Citadele.xlsx')
\ No newline at end of file
@@ -0,0 +1,26 @@
+import pandas as pd
+
+# Every convention is turned into one signed amount: income positive,
+# expenses negative, and zero or NaN on rows that are neither. The report
+# then takes its income and expense rows with split_signed instead of
+# testing each row in Python.
+
+
+def signed_indicator(amount, indicator, credit, debit):
+    # One amount column plus a column naming the side: CR/DR (Citadele),
+    # C/D (SEB), K/D (Paysera), įplaukos/išlaidos (Swedbank)
+    amount = amount.abs()
+    return amount.where(indicator == credit, -amount.where(indicator == debit))
+
+
+def signed_columns(credit, debit):
+    # Separate credit and debit columns (Citadele, Luminor, Šiaulių); empty
+    # and zero cells mean the row is on the other side
+    credit = pd.to_numeric(credit, errors='coerce')
+    debit = pd.to_numeric(debit, errors='coerce').abs()
+    return credit.clip(lower=0).fillna(0) - debit.fillna(0)
+
+
+def split_signed(amount):
+    # Positive amounts are income, negative ones expenses
+    return amount.where(amount > 0), amount.where(amount < 0).abs()
@@ -0,0 +1,97 @@
+import re
+import numpy as np
+import pandas as pd
+
+EXCEL_EPOCH = np.datetime64('1899-12-30', 'us')
+MAX_EXCEL_SERIAL = 2958465
+MICROSECONDS_PER_DAY = 86_400_000_000
+MAX_CENTS = 10 ** 15
+
+# The sign may come before the currency too ('-€5.00'), and the code may be
+# written in any case ('12,50 eur')
+MONEY_PATTERN = re.compile(
+    r'^\s*(?P<sign>[-+−])?\s*(?P<prefix>[A-Za-z]{3}|€)?\s*(?P<number>[-+−]?[\d\s\u00a0\u202f.,\']*\d)\s*'
+    r'(?P<suffix>[A-Za-z]{3}|€)?\s*$')
+# The last separator is the decimal point unless exactly three digits follow
+# it, in which case it groups thousands: 1 234,56 / 1,234.56 / 1.234,5 / 2,500.
+# This holds for all text, 2.500 as much as 2.500 EUR; only cells that are
+# numbers already are taken as they are.
+DECIMAL_PATTERN = re.compile(r'^(?P<whole>.*?)(?:[.,](?P<fraction>\d{1,2}|\d{4,}))?$')
+
+
+def map_unique(values, parse):
+    # Statements repeat the same dates, amounts and payment texts over and
+    # over, so `parse` only sees each distinct non-null value once and the
+    # results are spread back over the rows through the factorize codes.
+    # Missing values map to NaN.
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    parsed = parse(pd.Series(uniques, dtype=object))
+    result = parsed.reset_index(drop=True).reindex(codes)
+    result.index = values.index
+    return result
+
+
+def parse_dates(values, dayfirst=False):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    return map_unique(values, lambda unique: _parse_dates(unique, dayfirst))
+
+
+def _parse_dates(values, dayfirst):
+    # Statement date columns mix real dates, text in several layouts, Excel
+    # serial numbers and YYYYMMDD integers. Each kind is picked out with a
+    # mask and converted in one call, so nothing is parsed cell by cell and
+    # anything unparseable simply ends up NaT.
+    result = pd.Series(pd.NaT, index=values.index, dtype='datetime64[us]')
+    numbers = pd.to_numeric(values, errors='coerce')
+
+    compact = (numbers % 1 == 0) & numbers.between(19000101, 99991231)
+    if compact.any():
+        digits = numbers[compact].astype('int64').astype(str)
+        result[compact] = pd.to_datetime(digits, format='%Y%m%d', errors='coerce')
+
+    serial = numbers.between(1, MAX_EXCEL_SERIAL) & ~compact
+    if serial.any():
+        micros = (numbers[serial] * MICROSECONDS_PER_DAY).round().astype('int64').to_numpy()
+        result[serial] = EXCEL_EPOCH + micros.astype('timedelta64[us]')
+
+    text = values.notna() & numbers.isna()
+    if text.any():
+        # ISO dates first: with dayfirst, pandas would read 2024-01-05 as
+        # the 1st of May
+        parsed = pd.to_datetime(values[text], format='ISO8601', errors='coerce')
+        rest = parsed.isna()
+        if rest.any():
+            parsed[rest] = pd.to_datetime(values[text][rest], dayfirst=dayfirst, format='mixed', errors='coerce')
+        result[text] = parsed
+
+    return result
+
+
+def parse_money(values):
+    # Amount cells hold floats, or text such as '1 234,56 EUR', '-12.50' or
+    # '€1,234.00'. Everything becomes whole cents in an Int64 column, so sums
+    # are exact, plus the currency code when the text names one.
+    return map_unique(values, _parse_money)
+
+
+def _parse_money(values):
+    text = values.map(lambda value: isinstance(value, str))
+    amounts = pd.to_numeric(values.where(~text), errors='coerce').astype('float64')
+    currency = pd.Series(np.nan, index=values.index, dtype=object)
+
+    if text.any():
+        parts = values[text].astype(str).str.extract(MONEY_PATTERN)
+        number = (parts['sign'].fillna('') + parts['number']).str.replace(r'[\s\u00a0\u202f\']', '', regex=True).str.replace('−', '-')
+        split = number.str.extract(DECIMAL_PATTERN)
+        whole = split['whole'].str.replace(r'[.,]', '', regex=True)
+        amounts[text] = pd.to_numeric(whole + '.' + split['fraction'].fillna('0'), errors='coerce')
+        currency[text] = parts['prefix'].fillna(parts['suffix']).str.upper().replace('€', 'EUR')
+
+    cents = (amounts * 100).round()
+    return pd.DataFrame({
+        'cents': cents.where(cents.abs() < MAX_CENTS).astype('Int64'),
+        'currency': currency,
+    }, index=values.index)
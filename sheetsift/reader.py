@@ -0,0 +1,380 @@
+import posixpath
+import re
+import zipfile
+from datetime import datetime
+from itertools import islice
+from xml.etree.ElementTree import iterparse, fromstring
+from xml.parsers import expat
+
+import numpy as np
+import pandas as pd
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+from openpyxl.utils.cell import column_index_from_string, get_column_letter
+from openpyxl.utils.datetime import from_excel, CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904
+
+BATCH_SIZE = 10000
+CHUNK_SIZE = 64 * 1024
+
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _namespace(tag):
+    return tag[:tag.index('}') + 1] if tag.startswith('{') else ''
+
+
+def _first_sheet(archive):
+    workbook = fromstring(archive.read('xl/workbook.xml'))
+    ns = _namespace(workbook.tag)
+
+    properties = workbook.find(f'{ns}workbookPr')
+    date1904 = properties is not None and properties.get('date1904') in ('1', 'true')
+    epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+    sheet = workbook.find(f'{ns}sheets/{ns}sheet')
+    if sheet is None:
+        return None, epoch
+
+    rel_id = sheet.get(f'{REL_NS}id')
+    rels = fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(f'{PKG_REL_NS}Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/'), epoch
+            return posixpath.normpath(posixpath.join('xl', target)), epoch
+
+    return None, epoch
+
+
+class _SharedStrings:
+    # The shared string table is parsed only as far as the highest index
+    # asked for, so sniffing the header row does not pay for the whole table
+    def __init__(self, archive):
+        self._strings = []
+        if 'xl/sharedStrings.xml' in archive.namelist():
+            self._items = self._iter_items(archive)
+        else:
+            self._items = iter(())
+
+    @staticmethod
+    def _iter_items(archive):
+        with archive.open('xl/sharedStrings.xml') as fh:
+            for _, elem in iterparse(fh):
+                if elem.tag.endswith('}si'):
+                    text = _string_item(elem, _namespace(elem.tag))
+                    yield text if text != '' else None
+                    elem.clear()
+
+    def __getitem__(self, index):
+        try:
+            return self._strings[index]
+        except IndexError:
+            for text in self._items:
+                self._strings.append(text)
+                if len(self._strings) > index:
+                    return text
+            raise
+
+
+def _string_item(si, ns):
+    # Plain <t> or rich-text runs <r><t>; phonetic hints (<rPh>) are skipped
+    parts = []
+    for child in si:
+        if child.tag == f'{ns}t':
+            parts.append(child.text or '')
+        elif child.tag == f'{ns}r':
+            parts.extend(node.text or '' for node in child.iter(f'{ns}t'))
+    return ''.join(parts)
+
+
+def _date_styles(archive):
+    if 'xl/styles.xml' not in archive.namelist():
+        return set()
+
+    styles = fromstring(archive.read('xl/styles.xml'))
+    ns = _namespace(styles.tag)
+
+    formats = dict(BUILTIN_FORMATS)
+    for fmt in styles.iter(f'{ns}numFmt'):
+        formats[int(fmt.get('numFmtId'))] = fmt.get('formatCode')
+
+    date_styles = set()
+    cell_xfs = styles.find(f'{ns}cellXfs')
+    if cell_xfs is not None:
+        for index, xf in enumerate(cell_xfs.iter(f'{ns}xf')):
+            code = formats.get(int(xf.get('numFmtId', 0)))
+            if code and is_date_format(code):
+                date_styles.add(str(index))
+    return date_styles
+
+
+def iter_rows(source, columns=None):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    with zipfile.ZipFile(source) as archive:
+        sheet_path, epoch = _first_sheet(archive)
+        if sheet_path is None:
+            return
+
+        shared = _SharedStrings(archive)
+        date_styles = _date_styles(archive)
+
+        with archive.open(sheet_path) as fh:
+            yield from _parse_rows(fh, shared, date_styles, epoch, columns)
+
+
+def _parse_rows(fh, shared, date_styles, epoch, wanted=None):
+    # expat callbacks instead of an element tree: nothing but the current
+    # row is ever held in memory, however long the sheet is. With `wanted`
+    # set, cells outside those header columns are skipped before any value
+    # conversion happens.
+    chunk = fh.read(CHUNK_SIZE)
+    match = re.search(rb'<(\w+:)?worksheet\b', chunk)
+    prefix = match.group(1).decode() if match and match.group(1) else ''
+    row_tag, cell_tag, value_tag, text_tag, phonetic_tag = (
+        prefix + tag for tag in ('row', 'c', 'v', 't', 'rPh'))
+
+    completed = []
+    columns = {}
+    row = {}
+    text = []
+    position = 0
+    cell_type = 'n'
+    style = None
+    expected = 1
+    blank = 0
+    collect = False
+    phonetic = False
+    keep = None
+    skip = False
+
+    def start(name, attrs):
+        nonlocal position, cell_type, style, expected, blank, collect, phonetic, skip
+        if name == cell_tag:
+            ref = attrs.get('r')
+            if ref:
+                letters = ref.rstrip('0123456789')
+                position = columns.get(letters)
+                if position is None:
+                    position = columns[letters] = column_index_from_string(letters) - 1
+            skip = keep is not None and position not in keep
+            cell_type = attrs.get('t', 'n')
+            style = attrs.get('s')
+            text.clear()
+        elif name == value_tag or name == text_tag:
+            collect = not (phonetic or skip)
+        elif name == row_tag:
+            r = attrs.get('r')
+            index = int(r) if r else expected
+            blank += index - expected
+            expected = index + 1
+            position = 0
+            row.clear()
+        elif name == phonetic_tag:
+            phonetic = True
+
+    def end(name):
+        nonlocal position, blank, collect, phonetic, keep
+        if name == cell_tag:
+            if not skip:
+                value = _cell_value(''.join(text), cell_type, style, shared, date_styles, epoch)
+                if value is not None:
+                    row[position] = value
+            position += 1
+        elif name == value_tag or name == text_tag:
+            collect = False
+        elif name == row_tag:
+            # Rows are emitted lazily so trailing blank rows are dropped,
+            # the same way pandas trims them
+            if row:
+                if keep is None and wanted is not None:
+                    # First non-empty row is the header
+                    keep = {pos for pos, value in row.items() if value in wanted}
+                    for pos in set(row) - keep:
+                        del row[pos]
+                completed.extend({} for _ in range(blank))
+                blank = 0
+                completed.append(dict(row))
+            else:
+                blank += 1
+        elif name == phonetic_tag:
+            phonetic = False
+
+    def data(chunk):
+        if collect:
+            text.append(chunk)
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = data
+
+    row_end = f'</{row_tag}>'.encode()
+    pending = b''
+    dropper = None
+
+    while chunk:
+        if dropper is None and keep is not None:
+            dropper = _cell_dropper(prefix, keep)
+
+        if dropper is None:
+            parser.Parse(chunk, False)
+        else:
+            # Unwanted cells are cut out of the raw XML before expat sees
+            # them; only whole rows are filtered so no cell is split
+            pending += chunk
+            cut = pending.rfind(row_end)
+            if cut != -1:
+                cut += len(row_end)
+                parser.Parse(dropper.sub(b'', pending[:cut]), False)
+                pending = pending[cut:]
+
+        yield from completed
+        completed.clear()
+        chunk = fh.read(CHUNK_SIZE)
+
+    parser.Parse(pending, True)
+    yield from completed
+
+
+def _cell_dropper(prefix, keep):
+    letters = b'|'.join(get_column_letter(position + 1).encode() for position in sorted(keep))
+    tag = re.escape(f'{prefix}c'.encode())
+    wanted = rb'(?!(?:' + letters + rb')\d)' if letters else b''
+    return re.compile(
+        rb'<' + tag + rb'\b[^>]*?\br="' + wanted + rb'[A-Z]+\d+"[^>]*?(?:/>|>.*?</' + tag + rb'>)',
+        re.DOTALL,
+    )
+
+
+def _cell_value(text, cell_type, style, shared, date_styles, epoch):
+    if text == '' or cell_type == 'e':
+        return None
+    if cell_type == 's':
+        return shared[int(text)]
+    if cell_type == 'str' or cell_type == 'inlineStr':
+        return text
+    if cell_type == 'b':
+        return text == '1'
+    if cell_type == 'd':
+        return datetime.fromisoformat(text)
+
+    number = float(text)
+    if style in date_styles:
+        return from_excel(number, epoch)
+    if number.is_integer():
+        return int(number)
+    return number
+
+
+def _column_names(header, positions):
+    names = []
+    seen = {}
+    for position in positions:
+        name = header.get(position, f'Unnamed: {position}')
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _typed_column(values, dtype):
+    if dtype == 'category':
+        present = [value for value in values if value is not None]
+        # Only text columns become categorical: sorting mixed categories
+        # would fail, and such columns are grouped as plain objects anyway
+        if all(isinstance(value, str) for value in present):
+            return pd.Categorical(values, categories=sorted(set(present)))
+    elif dtype is not None:
+        return pd.to_numeric(pd.Series(values), errors='coerce').astype(dtype)
+
+    if all(value is None for value in values):
+        return np.full(len(values), np.nan)
+    return pd.Series(values)
+
+
+def _typed_batch(columns, names, dtypes=None):
+    dtypes = dtypes or {}
+    data = {name: _typed_column(values, dtypes.get(name)) for name, values in zip(names, columns)}
+    return pd.DataFrame(data, columns=names)
+
+
+def _concat_batches(batches):
+    # Per-batch categoricals only stay categorical through concat when
+    # every batch shares one dtype, so each is recoded onto the sorted union
+    # of all categories first. Sorted categories also keep groupby output in
+    # the same order as grouping the plain strings would.
+    for name in batches[0].columns:
+        if all(isinstance(batch[name].dtype, pd.CategoricalDtype) for batch in batches):
+            categories = sorted(set().union(*(batch[name].cat.categories for batch in batches)))
+            for batch in batches:
+                batch[name] = batch[name].cat.set_categories(categories)
+    return pd.concat(batches, ignore_index=True)
+
+
+def fill_category(series, value):
+    # fillna for columns that may be categorical: the fill value is added as
+    # a category, keeping the categories sorted
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.set_categories(sorted([*series.cat.categories, value]))
+    return series.fillna(value)
+
+
+def iter_batches(source, batch_size=BATCH_SIZE, columns=None, nrows=None, dtypes=None):
+    wanted = set(columns) if columns is not None else None
+    rows = iter_rows(source, wanted)
+    header = next(rows, None)
+    if header is None:
+        return
+
+    if wanted is None:
+        positions = range(max(header) + 1 if header else 0)
+    else:
+        positions = sorted(header)
+    names = _column_names(header, positions)
+    columns = [[] for _ in names]
+    count = 0
+    emitted = False
+
+    for row in (rows if nrows is None else islice(rows, nrows)):
+        for position, values in zip(positions, columns):
+            values.append(row.get(position))
+        count += 1
+
+        if count == batch_size:
+            yield _typed_batch(columns, names, dtypes)
+            columns = [[] for _ in names]
+            count = 0
+            emitted = True
+
+    # Stops the sheet parse early when only the first rows were wanted
+    rows.close()
+
+    # A header-only sheet still yields an empty batch carrying the columns
+    if count or not emitted:
+        yield _typed_batch(columns, names, dtypes)
+
+
+def read_statement(source, columns=None, nrows=None, batch_size=BATCH_SIZE, dtypes=None):
+    batches = list(iter_batches(source, batch_size, columns, nrows, dtypes))
+    if not batches:
+        return pd.DataFrame()
+    if len(batches) == 1:
+        return batches[0]
+    return _concat_batches(batches)
+
+
+def sniff_format(source, formats, nrows=0):
+    # Picks the first format whose columns are all in the header, reading
+    # only the header row (plus `nrows` rows) instead of the whole sheet
+    header = read_statement(source, nrows=nrows).columns
+    for name, columns in formats.items():
+        if all(col in header for col in columns):
+            return name
+    return None
@@ -0,0 +1,441 @@
+import importlib.util
+import io
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from sheetsift.normalize import split_signed
+from sheetsift.reader import fill_category
+
+# Canonical transaction columns. Every bank filter turns its statement into a
+# frame of these (the optional ones only when the bank has them) and the
+# pivots, payment purposes, the Bendra sheet and the workbook are all built
+# from it here, the same way for every bank.
+DATE = 'DATA'
+YEAR = 'METAI'
+MONTH = 'MĖNUO'
+ACCOUNT = 'ASMENS SĄSKAITA'
+CURRENCY = 'VALIUTA'
+COUNTERPARTY = 'MOKĖTOJAS/GAVĖJAS'
+COUNTERPARTY_ACCOUNT = 'MOKĖTOJO/GAVĖJO SĄSKAITA'
+PURPOSE = 'MOKĖJIMO PASKIRTIS'
+AMOUNT = 'SUMA'
+PERIOD = 'LAIKOTARPIS'
+
+COLUMNS = [DATE, YEAR, MONTH, ACCOUNT, CURRENCY, COUNTERPARTY, COUNTERPARTY_ACCOUNT, PURPOSE, AMOUNT]
+KEYS = [ACCOUNT, CURRENCY, COUNTERPARTY, COUNTERPARTY_ACCOUNT]
+# Own accounts and currencies each get their pair of rows on Bendra
+OWNER_KEYS = [ACCOUNT, CURRENCY]
+CREDIT_NAMES = {COUNTERPARTY: 'MOKĖTOJAS', COUNTERPARTY_ACCOUNT: 'MOKĖTOJO SĄSKAITA'}
+DEBIT_NAMES = {COUNTERPARTY: 'GAVĖJAS', COUNTERPARTY_ACCOUNT: 'GAVĖJO SĄSKAITA'}
+
+# What a bank's statement does not have at all reads the same as an empty cell
+MISSING = {COUNTERPARTY_ACCOUNT: 'Sąskaita nenurodyta', PURPOSE: 'Be paskirties'}
+# The own account of a bank's statements that do not name it
+NO_ACCOUNT = 'Sąskaita nenurodyta'
+# The currency of amounts that name none, in a report that names several
+NO_CURRENCY = 'Valiuta nenurodyta'
+
+# Report granularities, as the number of periods in a year
+PERIODS = {'year': 1, 'quarter': 4, 'month': 12}
+
+STREAMING_ROWS = 100_000
+STREAM_BLOCK_ROWS = 10_000
+
+# Excel's limits: rows under the header row of a sheet, characters in a cell
+EXCEL_ROWS = 1_048_575
+EXCEL_CELL_CHARS = 32_767
+
+# Result formats and their file endings. Everything but xlsx is a zip of one
+# file per table, the Bendra row labels in a column of their own.
+OUTPUTS = {'xlsx': '.xlsx', 'csv': '.csv.zip', 'parquet': '.parquet.zip', 'ndjson': '.ndjson.zip'}
+# Parquet is written with pyarrow, an optional dependency
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+SUMMARY_LABEL = 'EILUTĖ'
+
+
+def transactions(year, counterparty, amount, account=None, counterparty_account=None, purpose=None,
+                 month=None, date=None, currency=None):
+    # `amount` is signed cents: income positive, expenses negative, and zero
+    # or missing on rows that are neither. `currency` is the code the amount
+    # text names, where it names one.
+    columns = {
+        DATE: date,
+        YEAR: year,
+        MONTH: month,
+        ACCOUNT: account,
+        CURRENCY: currency,
+        COUNTERPARTY: counterparty,
+        COUNTERPARTY_ACCOUNT: counterparty_account,
+        PURPOSE: purpose,
+        AMOUNT: amount,
+    }
+    return pd.DataFrame({name: column for name, column in columns.items() if column is not None})
+
+
+def _overlap(frames):
+    # Per frame, the rows some other statement of the same own account also
+    # covers: same account, dated within that statement's first and last
+    # date of it. Without an own account or dates nothing is known to be
+    # shared.
+    spans = [frame.groupby(ACCOUNT, observed=True)[DATE].agg(['min', 'max'])
+             if ACCOUNT in frame and DATE in frame else None for frame in frames]
+    masks = []
+    for i, frame in enumerate(frames):
+        shared = pd.Series(False, index=frame.index)
+        if spans[i] is not None:
+            accounts = frame[ACCOUNT].astype(object)
+            for j, span in enumerate(spans):
+                if j != i and span is not None:
+                    shared |= frame[DATE].between(accounts.map(span['min']), accounts.map(span['max']))
+        masks.append(shared.fillna(False).astype(bool))
+    return masks
+
+
+def combine_transactions(frames):
+    # Several statements of one bank in one report. Statements of the same
+    # own account for overlapping periods repeat the same transactions, so
+    # within the overlap a row is kept as many times as the statement that
+    # has it most often: identical payments within one statement all count,
+    # the overlap only once. Every other row is kept as it is, since equal
+    # rows of different or unnamed accounts are different payments.
+    if len(frames) == 1:
+        return frames[0]
+    overlaps = _overlap(frames)
+    # Variants of a bank's statement do not all have the same fields. A field
+    # some of the frames lack reads as empty in those, so their rows keep
+    # their place in the pivots instead of being grouped away as missing.
+    present = set().union(*(frame.columns for frame in frames))
+    fills = {column: value for column, value in {**MISSING, ACCOUNT: NO_ACCOUNT}.items() if column in present}
+    frames = [frame.assign(**{column: value for column, value in fills.items() if column not in frame})
+              for frame in frames]
+
+    # Rows outside an overlap get an occurrence of their own, below zero, so
+    # no other row ever matches them
+    marked, unique = [], 0
+    for frame, shared in zip(frames, overlaps):
+        occurrence = pd.Series(np.arange(-unique - 1, -unique - len(frame) - 1, -1), index=frame.index)
+        unique += len(frame)
+        if shared.any():
+            rows = frame[shared]
+            occurrence[shared] = rows.groupby(list(rows.columns), dropna=False, observed=True).cumcount()
+        marked.append(frame.assign(occurrence=occurrence))
+    combined = pd.concat(marked, ignore_index=True).drop_duplicates()
+    return combined[[column for column in COLUMNS if column in combined]].reset_index(drop=True)
+
+
+def merge_banks(frames):
+    # Statements of different banks in one report, `frames` mapping each
+    # bank's name to its combined frame. Rows that do not name the own
+    # account are told apart by the bank's name, and fields a bank lacks, on
+    # some rows or all, are filled so its rows stay in the pivots. Overlaps
+    # are only looked for within a bank.
+    labelled = []
+    for name, frame in frames.items():
+        fills = {**MISSING, ACCOUNT: name}
+        labelled.append(frame.assign(**{column: fill_category(frame[column], value) if column in frame else value
+                                        for column, value in fills.items()}))
+    return pd.concat(labelled, ignore_index=True)
+
+
+def period_codes(frame, granularity='year'):
+    # Compact integer codes that sort in time order: the year itself, or
+    # year * 4 + quarter and year * 12 + month with both counted from zero.
+    # Pivoting on these keeps 120+ month columns as cheap as a few years.
+    per_year = PERIODS[granularity]
+    if per_year == 1:
+        return frame[YEAR]
+    return frame[YEAR].astype('Int32') * per_year + (frame[MONTH].astype('Int32') - 1) * per_year // 12
+
+
+def period_label(code, granularity='year'):
+    year, index = divmod(int(code), PERIODS[granularity])
+    if granularity == 'year':
+        return year
+    if granularity == 'quarter':
+        return f'{year} Q{index + 1}'
+    return f'{year}-{index + 1:02}'
+
+
+def _side(frame, amounts, names, period=YEAR, purposes=None):
+    keys = [key for key in KEYS if key in frame]
+    rows = frame.assign(**{AMOUNT: amounts})[amounts.notna()]
+    return rows, aggregate(rows, keys, period, purposes).rename(columns=names)
+
+
+def aggregate(rows, keys, period=YEAR, purposes=None):
+    # The sums per period (the `period` column, years by default) and the
+    # distinct purposes of every counterparty in one grouping: rows are
+    # labelled with their group once, the sums are a bincount over
+    # (group, period) cells and the purposes go through join_distinct on the
+    # same group codes. Same output as pivot_table with fill_value=0 merged
+    # with a groupby of ' ||\n'-joined sorted(set(...)): groups and periods
+    # only appear if they have a dated row, while purposes also come from
+    # undated rows. With `purposes` only that many of the most frequent
+    # purposes are kept, through join_top.
+    grouper = rows.groupby(keys, observed=True, sort=True)
+    codes = grouper.ngroup().fillna(-1).to_numpy(dtype='int64')
+    table = grouper.size().index.to_frame(index=False)
+    year_codes, years = pd.factorize(rows[period], sort=True)
+
+    dated = (codes >= 0) & (year_codes >= 0)
+    cells = codes[dated] * len(years) + year_codes[dated]
+    # float64 sums of whole cents stay exact up to 2**53 cents
+    sums = np.bincount(cells, weights=rows[AMOUNT].to_numpy(dtype='float64')[dated],
+                       minlength=len(table) * len(years)).reshape(len(table), len(years))
+
+    present = np.unique(codes[dated])
+    present_years = np.unique(year_codes[dated])
+    table = table.iloc[present]
+    # pivot_table's unstack drops key values that only occur in undated rows
+    # and then reorders such a key by where its remaining values first appear
+    # in the sorted groups; other keys stay sorted. The sheets keep that order.
+    ranks = []
+    for key in keys:
+        appearance, values = pd.factorize(table[key])
+        if len(values) == rows[key].nunique():
+            appearance = pd.factorize(table[key], sort=True)[0]
+        ranks.append(appearance)
+    order = np.lexsort(ranks[::-1])
+    present = present[order]
+    table = table.iloc[order].reset_index(drop=True)
+    for year, column in zip(years[present_years], sums[present][:, present_years].T):
+        table[year] = column / 100
+
+    if PURPOSE in rows:
+        joined = join_top(codes, rows[PURPOSE], purposes) if purposes is not None else join_distinct(codes, rows[PURPOSE])
+        table[PURPOSE] = joined.reindex(present).to_numpy()
+
+    return table
+
+
+def join_distinct(groups, values, separator=' ||\n'):
+    # separator.join(sorted(set(x))) for every group without a Python set
+    # per group: the strings are ranked once, the (group, rank) pairs are
+    # deduplicated and sorted in bulk as single integers, and each group's
+    # run of strings is joined. `groups` are integer codes, -1 for no group;
+    # returns the joined text indexed by group code.
+    ranks, strings = pd.factorize(np.asarray(values, dtype=object), sort=True)
+    groups = np.asarray(groups, dtype='int64')
+    keep = (groups >= 0) & (ranks >= 0)
+    pairs = np.sort(pd.unique(groups[keep] * max(len(strings), 1) + ranks[keep]))
+    pair_groups, pair_ranks = np.divmod(pairs, max(len(strings), 1))
+
+    starts = np.flatnonzero(np.diff(pair_groups, prepend=-1))
+    ends = np.append(starts[1:], len(pairs))
+    texts = strings[pair_ranks].tolist()
+    return pd.Series([separator.join(texts[start:end]) for start, end in zip(starts, ends)],
+                     index=pair_groups[starts], dtype=object)
+
+
+def join_top(groups, values, top, separator=' ||\n'):
+    # join_distinct keeping only the `top` most frequent strings of each
+    # group, as 'text (count)' ties alphabetical, and 'kiti (N)' for the N
+    # other distinct strings. Counted in bulk on (group, rank) pairs, so only
+    # the kept strings of a group are ever built.
+    ranks, strings = pd.factorize(np.asarray(values, dtype=object), sort=True)
+    groups = np.asarray(groups, dtype='int64')
+    keep = (groups >= 0) & (ranks >= 0)
+    width = max(len(strings), 1)
+    pairs = np.sort(groups[keep] * width + ranks[keep])
+    starts = np.flatnonzero(np.diff(pairs, prepend=-1))
+    counts = np.diff(np.append(starts, len(pairs)))
+    pair_groups, pair_ranks = np.divmod(pairs[starts], width)
+
+    order = np.lexsort((pair_ranks, -counts, pair_groups))
+    pair_groups, pair_ranks, counts = pair_groups[order], pair_ranks[order], counts[order]
+    group_starts = np.flatnonzero(np.diff(pair_groups, prepend=-1))
+    distinct = np.diff(np.append(group_starts, len(pair_groups)))
+    position = np.arange(len(pair_groups)) - np.repeat(group_starts, distinct)
+    kept = position < top
+
+    texts = [f'{text} ({count})' for text, count in zip(strings[pair_ranks[kept]].tolist(), counts[kept].tolist())]
+    kept_starts = np.flatnonzero(np.diff(pair_groups[kept], prepend=-1))
+    kept_ends = np.append(kept_starts[1:], len(texts))
+    others = (distinct - top).tolist()
+    return pd.Series([separator.join(texts[start:end] + ([f'kiti ({other})'] if other > 0 else []))
+                      for start, end, other in zip(kept_starts, kept_ends, others)],
+                     index=pair_groups[group_starts], dtype=object)
+
+
+def _summary(frame, credit, debit, period=YEAR):
+    years = [int(y) for y in sorted(frame[period].dropna().unique())]
+    keys = [key for key in OWNER_KEYS if key in frame]
+
+    # One grouped sum by (account, side, period) instead of filtering both
+    # sides once per account. Every own account the statement names, and
+    # each currency of it in a report of several, gets a pair of rows, zeros
+    # included, in the order they first appear.
+    columns = keys + [period, AMOUNT]
+    sides = pd.concat([credit[columns].assign(side=0), debit[columns].assign(side=1)])
+    sums = sides.groupby(keys + ['side', period], observed=True)[AMOUNT].sum()
+
+    if keys:
+        owners = list(frame[keys].dropna().drop_duplicates().itertuples(index=False, name=None))
+        index = pd.MultiIndex.from_tuples([(*owner, side) for owner in owners for side in (0, 1)],
+                                          names=keys + ['side'])
+        prefixes = [''.join(f'{part} ' for part in owner) for owner in owners]
+    else:
+        index = pd.Index([0, 1], name='side')
+        prefixes = ['']
+
+    cents = sums.unstack(period).reindex(index=index, columns=years) if len(sums) else \
+        pd.DataFrame(index=index, columns=years)
+    table = cents.astype('float64').fillna(0) / 100
+    # Added period by period like the row sum it replaces, so 'Viso' is
+    # unchanged to the last bit
+    total = 0
+    for year in years:
+        total = total + table[year]
+    table['Viso'] = total
+    table.index = [prefix + label for prefix in prefixes for label in ('Bendros Pajamos', 'Bendros Išlaidos')]
+    table.columns.name = None
+    return table
+
+
+def _currencies(frame):
+    # Amounts in different currencies are never added up together: when the
+    # statements name more than one, the currency is a key of the sheets and
+    # of Bendra. With one or none the report is as without the column.
+    if CURRENCY not in frame:
+        return frame
+    if frame[CURRENCY].nunique() > 1:
+        return frame.assign(**{CURRENCY: fill_category(frame[CURRENCY], NO_CURRENCY)})
+    return frame.drop(columns=CURRENCY)
+
+
+def build_report(frame, granularity='year', purposes=None):
+    # Pajamos, Išlaidos and Bendra get one column per year, quarter or month
+    if purposes is not None and purposes < 1:
+        raise ValueError(f'Netinkamas paskirčių skaičius: {purposes}')
+    frame = _currencies(frame)
+    frame = frame.assign(**{PERIOD: period_codes(frame, granularity)})
+    labels = {code: period_label(code, granularity) for code in frame[PERIOD].dropna().unique()}
+
+    credit_amounts, debit_amounts = split_signed(frame[AMOUNT])
+    credit, credit_final = _side(frame, credit_amounts, {**CREDIT_NAMES, **labels}, PERIOD, purposes)
+    debit, debit_final = _side(frame, debit_amounts, {**DEBIT_NAMES, **labels}, PERIOD, purposes)
+    return credit_final, debit_final, _summary(frame, credit, debit, PERIOD).rename(columns=labels)
+
+
+def _stream_sheet(workbook, name, table, index=False):
+    # The workbook is in xlsxwriter's constant_memory mode, where each row is
+    # flushed to disk once the next one starts, so the rows go out strictly
+    # in order, a block of them converted to plain values at a time
+    sheet = workbook.add_worksheet(name)
+    offset = 1 if index else 0
+    sheet.write_row(0, offset, table.columns.tolist())
+    for start in range(0, len(table), STREAM_BLOCK_ROWS):
+        block = table.iloc[start:start + STREAM_BLOCK_ROWS]
+        values = block.astype(object).where(block.notna(), None).to_numpy().tolist()
+        for row, (label, cells) in enumerate(zip(block.index.tolist(), values), start + 1):
+            if index:
+                sheet.write(row, 0, label)
+            sheet.write_row(row, offset, cells)
+
+
+def cap_text(text, limit, separator=' ||\n'):
+    # Whole values while they fit, then how many did not
+    if len(text) <= limit:
+        return text
+    values = text.split(separator)
+    room = limit - len(f'{separator}... ir dar {len(values)}')
+    kept, length = [], -len(separator)
+    for value in values:
+        length += len(separator) + len(value)
+        if length > room:
+            break
+        kept.append(value)
+    return separator.join(kept + [f'... ir dar {len(values) - len(kept)}'])
+
+
+def _excel_cells(table):
+    # Only the joined payment purposes can outgrow a cell
+    if PURPOSE not in table:
+        return table
+    long = table[PURPOSE].str.len() > EXCEL_CELL_CHARS
+    if not long.any():
+        return table
+    table = table.copy()
+    table.loc[long, PURPOSE] = table.loc[long, PURPOSE].map(lambda text: cap_text(text, EXCEL_CELL_CHARS))
+    return table
+
+
+def _sheet_parts(name, table):
+    # A table longer than a sheet goes on Pajamos_1, Pajamos_2, ...
+    if len(table) <= EXCEL_ROWS:
+        return [(name, table)]
+    return [(f'{name}_{number}', table.iloc[start:start + EXCEL_ROWS])
+            for number, start in enumerate(range(0, len(table), EXCEL_ROWS), 1)]
+
+
+def available_outputs():
+    # The result formats this install can write, for the upload form
+    return [output for output in OUTPUTS if output != 'parquet' or HAS_PYARROW]
+
+
+def _suffix(output):
+    if output not in OUTPUTS:
+        raise ValueError(f'Nežinomas rezultato formatas: {output}')
+    if output == 'parquet' and not HAS_PYARROW:
+        raise ValueError('Parquet formatui reikia įdiegti pyarrow')
+    return OUTPUTS[output]
+
+
+def output_name(name, output='xlsx'):
+    return os.path.splitext(name)[0] + _suffix(output)
+
+
+def _write_table(fh, table, output):
+    if output == 'parquet':
+        table.rename(columns=str).to_parquet(fh, index=False)
+        return
+    with io.TextIOWrapper(fh, encoding='utf-8', newline='') as text:
+        if output == 'csv':
+            table.to_csv(text, index=False)
+        else:
+            table.to_json(text, orient='records', lines=True, force_ascii=False)
+
+
+def _write_archive(result_path, tables, output):
+    try:
+        with zipfile.ZipFile(result_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, table in tables.items():
+                with archive.open(f'{name}.{output}', 'w') as fh:
+                    _write_table(fh, table, output)
+    except Exception:
+        # No half-written archive is left to download
+        if os.path.exists(result_path):
+            os.remove(result_path)
+        raise
+
+
+def write_report(result_path, frame, granularity='year', streaming=None, output='xlsx', purposes=None):
+    # `streaming` writes the sheets row by row in constant memory instead of
+    # building every cell first; by default only reports with more than
+    # STREAMING_ROWS Pajamos and Išlaidos rows are streamed. Both modes give
+    # the same cells. Sheets and cells are kept within Excel's limits. Other
+    # `output` formats never touch xlsxwriter and are not capped.
+    credit_final, debit_final, summary = build_report(frame, granularity, purposes)
+    if _suffix(output) != '.xlsx':
+        summary = summary.rename_axis(SUMMARY_LABEL).reset_index()
+        _write_archive(result_path, {'Pajamos': credit_final, 'Išlaidos': debit_final, 'Bendra': summary}, output)
+        return
+
+    if streaming is None:
+        streaming = len(credit_final) + len(debit_final) > STREAMING_ROWS
+    sheets = _sheet_parts('Pajamos', _excel_cells(credit_final)) + \
+        _sheet_parts('Išlaidos', _excel_cells(debit_final))
+
+    if streaming:
+        with xlsxwriter.Workbook(result_path, {'constant_memory': True}) as workbook:
+            for name, table in sheets:
+                _stream_sheet(workbook, name, table)
+            _stream_sheet(workbook, 'Bendra', summary, index=True)
+        return
+
+    with pd.ExcelWriter(result_path, engine='xlsxwriter') as writer:
+        for name, table in sheets:
+            table.to_excel(writer, sheet_name=name, index=False)
+        summary.to_excel(writer, sheet_name='Bendra')
@@ -9,9 +9,25 @@ from .filters.siauliu import analyze_siauliu
 from flask_login import login_required, current_user
 import os
 from .utils import cleanup_temp_files
+from .detection import build_index, detect_bank
+from .uploads import uploaded_files
+from .consolidated import BANKS, analyze_banks
+from .report import available_outputs
 
 main = Blueprint('main', __name__)
 
+ANALYZERS = {
+    'seb': analyze_seb,
+    'swedbank': analyze_swedbank,
+    'luminor': analyze_luminor,
+    'citadele': analyze_citadele,
+    'paysera': analyze_paysera,
+    'revolut': analyze_revolut,
+    'siauliubankas': analyze_siauliu,
+}
+
+FORMAT_INDEX = build_index({bank: module.FORMATS for bank, (_, module) in BANKS.items()})
+
 @main.route('/apie')
 def apie():
     if current_user.is_authenticated:
@@ -21,7 +37,7 @@ def apie():
 @main.route('/')
 @login_required
 def index():
-    return render_template('index.html')
+    return render_template('index.html', outputs=available_outputs())
 
 @main.route('/naudojimas')
 @login_required
@@ -64,19 +80,21 @@ def atsisiusti():
 @login_required
 def analyze():
     bank = request.form.get('bank')
-    if bank == 'seb':
-        return analyze_seb()
-    elif bank == 'swedbank':
-        return analyze_swedbank()
-    elif bank == 'luminor':
-        return analyze_luminor()
-    elif bank == 'citadele':
-        return analyze_citadele()
-    elif bank == 'paysera':
-        return analyze_paysera()
-    elif bank == 'revolut':
-        return analyze_revolut()
-    elif bank == 'siauliubankas':
-        return analyze_siauliu()
-    else:
-        return render_template('error.html')
\ No newline at end of file
+    if not bank or bank == 'auto':
+        files = uploaded_files()
+        try:
+            detected = [detect_bank(file.stream, FORMAT_INDEX) for file in files]
+        except Exception as e:
+            print(f"Klaida: {e}")
+            detected = [None]
+        if None in detected:
+            return redirect(url_for('main.klaida'))
+        # Statements of different banks are reported together
+        if len({bank for bank, _ in detected}) > 1:
+            return analyze_banks(files, detected)
+        bank = detected[0][0]
+
+    analyzer = ANALYZERS.get(bank)
+    if analyzer is None:
+        return render_template('error.html')
+    return analyzer()
@@ -0,0 +1,129 @@
+from sheetsift.parsing import parse_dates, parse_money, map_unique
+from sheetsift.normalize import signed_indicator, signed_columns
+from sheetsift.reader import fill_category
+from sheetsift.report import transactions
+
+# A bank format is declared as data, one dict per statement layout:
+#
+#   'date':     the booking date column; 'dayfirst': True for day-first text
+#   'amount':   the sign convention, one of
+#                 {'signed': column}
+#                 {'indicator': column, 'amount': column, 'credit': 'CR', 'debit': 'DR'}
+#                 {'credit': column, 'debit': column}
+#   'account', 'counterparty', 'counterparty_account', 'purpose':
+#               a field {'column': name, 'fill': text}. With 'pattern' (a
+#               compiled regex) and 'group' (one of its named groups) the
+#               value is extracted from the column's text instead, and
+#               'fallback': True keeps the whole text when nothing matches.
+#               A counterparty may also be {'credit': field, 'debit': field}
+#               when income and expenses name the other side differently.
+#
+# Everything else is derived: the columns a spec reads are its header
+# signature for sniffing and detection and the projection the reader loads,
+# and plain (not extracted) party columns and indicators are read as
+# categoricals.
+FIELDS = ['account', 'counterparty', 'counterparty_account', 'purpose']
+CATEGORY_FIELDS = ['account', 'counterparty', 'counterparty_account']
+
+
+def _field_specs(spec, name):
+    field = spec.get(name)
+    if field is None:
+        return []
+    if 'credit' in field:
+        return [field['credit'], field['debit']]
+    return [field]
+
+
+def _amount_columns(amount):
+    if 'signed' in amount:
+        return [amount['signed']]
+    if 'indicator' in amount:
+        return [amount['amount'], amount['indicator']]
+    if 'credit' in amount and 'debit' in amount:
+        return [amount['credit'], amount['debit']]
+    raise ValueError(f'Nežinomas sumos formatas: {amount}')
+
+
+def spec_columns(spec):
+    columns = [spec['date']]
+    for name in FIELDS:
+        columns.extend(field['column'] for field in _field_specs(spec, name))
+    columns.extend(_amount_columns(spec['amount']))
+    return list(dict.fromkeys(columns))
+
+
+def spec_dtypes(spec):
+    dtypes = {}
+    for name in CATEGORY_FIELDS:
+        for field in _field_specs(spec, name):
+            if 'pattern' not in field:
+                dtypes[field['column']] = 'category'
+    if 'indicator' in spec['amount']:
+        dtypes[spec['amount']['indicator']] = 'category'
+    return dtypes
+
+
+def compile_specs(specs):
+    # The FORMATS and DTYPES a filter module exposes to the reader, sniffing
+    # and bank detection
+    formats = {variant: spec_columns(spec) for variant, spec in specs.items()}
+    dtypes = {}
+    for spec in specs.values():
+        dtypes.update(spec_dtypes(spec))
+    return formats, dtypes
+
+
+def resolve_field(field, df, extracted=None):
+    # `extracted` memoizes pattern matches per (column, pattern), so fields
+    # pulled from the same text with one pattern share a single pass
+    values = df[field['column']]
+    if 'pattern' in field:
+        key = (field['column'], field['pattern'])
+        if extracted is None or key not in extracted:
+            pattern = field['pattern']
+            matches = map_unique(values, lambda texts: texts.astype(str).str.extract(pattern))
+            if extracted is not None:
+                extracted[key] = matches
+        else:
+            matches = extracted[key]
+        result = matches[field['group']].str.strip()
+        if field.get('fallback'):
+            result = result.fillna(values)
+        values = result
+    return fill_category(values, field['fill']) if 'fill' in field else values
+
+
+def _amount(amount, df):
+    # Signed cents, and the currency the amount text names
+    if 'signed' in amount:
+        money = parse_money(df[amount['signed']])
+        return money['cents'], money['currency']
+    if 'indicator' in amount:
+        money = parse_money(df[amount['amount']])
+        return signed_indicator(money['cents'], df[amount['indicator']], amount['credit'], amount['debit']), \
+            money['currency']
+    credit, debit = parse_money(df[amount['credit']]), parse_money(df[amount['debit']])
+    return signed_columns(credit['cents'], debit['cents']), credit['currency'].fillna(debit['currency'])
+
+
+def build_transactions(spec, df):
+    extracted = {}
+    amount, currency = _amount(spec['amount'], df)
+    fields = {}
+    for name in FIELDS:
+        field = spec.get(name)
+        if field is None:
+            continue
+        if 'credit' in field:
+            credit = resolve_field(field['credit'], df, extracted)
+            debit = resolve_field(field['debit'], df, extracted)
+            fields[name] = credit.where(amount > 0, debit)
+        else:
+            fields[name] = resolve_field(field, df, extracted)
+
+    dates = parse_dates(df[spec['date']], dayfirst=spec.get('dayfirst', False))
+    if currency.notna().any():
+        fields['currency'] = currency.astype('category')
+    return transactions(date=dates, year=dates.dt.year.astype('Int16'), month=dates.dt.month.astype('Int8'),
+                        amount=amount, **fields)
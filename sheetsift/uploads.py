@@ -0,0 +1,124 @@
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import Request, current_app, request
+from werkzeug.exceptions import BadRequestKeyError
+
+UPLOAD_SPOOL_SIZE = 16 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+# Threads a multi-file upload is read on when there is no parse pool
+UPLOAD_THREADS = 4
+
+_pool_lock = threading.Lock()
+
+
+class HashingSpool(tempfile.SpooledTemporaryFile):
+    # Hashes the upload as werkzeug writes it in, so the content hash costs
+    # no second pass over the file
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def write(self, s):
+        self.sha256.update(s)
+        return super().write(s)
+
+
+class SpooledRequest(Request):
+    # Uploads are kept in memory and parsed straight from the stream; only
+    # files above UPLOAD_SPOOL_SIZE spill to an anonymous temporary file, so
+    # the client-supplied filename never becomes a path on disk
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        max_size = current_app.config.get('UPLOAD_SPOOL_SIZE', UPLOAD_SPOOL_SIZE)
+        folder = current_app.config.get('UPLOAD_FOLDER')
+        if not folder or not os.path.isdir(folder):
+            folder = None
+        return HashingSpool(max_size=max_size, mode='w+b', dir=folder)
+
+
+def upload_digest(file):
+    sha256 = getattr(file.stream, 'sha256', None)
+    if sha256 is None:
+        sha256 = hashlib.sha256()
+        file.stream.seek(0)
+        for chunk in iter(lambda: file.stream.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+        file.stream.seek(0)
+    return sha256.hexdigest()
+
+
+def uploaded_files(name='file'):
+    # Every file posted under `name`; none at all is a 400, as
+    # request.files[name] would be
+    if name not in request.files:
+        raise BadRequestKeyError(name)
+    return request.files.getlist(name)
+
+
+def _start_pool(workers):
+    # Workers are started by a fork server (spawned where there is none)
+    # rather than forked from the threaded web server
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def init_parse_pool(app):
+    workers = app.config.get('PARSE_WORKERS')
+    if workers:
+        app.extensions['parse_pool'] = _start_pool(workers)
+
+
+def run_in_pool(fn, *args, **kwargs):
+    # fn(*args, **kwargs) in the app's parse pool. A worker that dies breaks
+    # the whole pool, so a broken pool is replaced by a new one for the
+    # requests after this one.
+    pool = current_app.extensions['parse_pool']
+    try:
+        return pool.submit(fn, *args, **kwargs).result()
+    except BrokenProcessPool:
+        with _pool_lock:
+            if current_app.extensions['parse_pool'] is pool:
+                current_app.extensions['parse_pool'] = _start_pool(current_app.config['PARSE_WORKERS'])
+                pool.shutdown(wait=False)
+        raise
+
+
+@contextmanager
+def spilled(file):
+    # The upload copied to a file of its own in chunks, for a worker process
+    # to open by path; removed afterwards
+    folder = current_app.config.get('UPLOAD_FOLDER')
+    if not folder or not os.path.isdir(folder):
+        folder = None
+    fd, path = tempfile.mkstemp(suffix='.xlsx', dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            file.stream.seek(0)
+            shutil.copyfileobj(file.stream, out, HASH_CHUNK_SIZE)
+        yield path
+    finally:
+        os.remove(path)
+
+
+def map_uploads(fn, jobs):
+    # fn(*job) for every upload, on at most as many threads as there are
+    # parse workers (UPLOAD_THREADS without a pool), each inside the app
+    # context; the results come back in upload order
+    if len(jobs) == 1:
+        return [fn(*jobs[0])]
+
+    app = current_app._get_current_object()
+
+    def run(job):
+        with app.app_context():
+            return fn(*job)
+
+    threads = min(len(jobs), app.config.get('PARSE_WORKERS') or UPLOAD_THREADS)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(run, jobs))
@@ -12,13 +12,16 @@ def cleanup_temp_files(*folders):
             except Exception as e:
                 print(f"Nepavyko ištrinti failo: {file_path}. Klaida: {e}")
 
-def schedule_file_deletion(file_path, delay=60):
+def schedule_file_deletion(file_path, delay=60, remove_folder=False):
+    # `remove_folder` also removes the folder the file is in once it is empty
     def delete_file():
         time.sleep(delay)
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
                 print(f"Failas {file_path} ištrintas po {delay} sekundžių.")
+            if remove_folder and not os.listdir(os.path.dirname(file_path)):
+                os.rmdir(os.path.dirname(file_path))
         except Exception as e:
             print(f"Nepavyko ištrinti failo {file_path}: {e}")
 
@@ -7,14 +7,15 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from sheetsift import create_app, db
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     app = create_app({
         'TESTING': True,
         'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
         'UPLOAD_FOLDER': 'tests/uploads',
-        'RESULT_FOLDER': 'tests/results',
+        'RESULT_FOLDER': str(tmp_path / 'results'),
         'SECRET_KEY': 'test_secret'
     })
+    os.makedirs(app.config['RESULT_FOLDER'])
     with app.app_context():
         db.create_all()
         yield app
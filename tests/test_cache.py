@@ -0,0 +1,224 @@
+import io
+import os
+import re
+import time
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from werkzeug.datastructures import FileStorage
+from sheetsift import create_app
+from sheetsift.cache import FileCache, load_statement, spec_fingerprint
+
+def write_bytes(data):
+    def write(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return write
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def test_file_cache_round_trip(tmp_path):
+    cache = FileCache(str(tmp_path), max_bytes=1000)
+
+    assert cache.load(('raktas', 1), read_bytes) is None
+    cache.store(('raktas', 1), write_bytes(b'duomenys'))
+
+    assert cache.load(('raktas', 1), read_bytes) == b'duomenys'
+    assert cache.load(('raktas', 2), read_bytes) is None
+
+def test_file_cache_evicts_least_recently_used(tmp_path):
+    cache = FileCache(str(tmp_path), max_bytes=250)
+    for i, key in enumerate(['a', 'b']):
+        cache.store((key,), write_bytes(b'x' * 100))
+        os.utime(cache.path(key), (time.time() - 100 + i, time.time() - 100 + i))
+
+    # Reading 'a' makes 'b' the oldest entry
+    assert cache.load(('a',), read_bytes) is not None
+    cache.store(('c',), write_bytes(b'x' * 100))
+
+    assert os.path.exists(cache.path('a'))
+    assert not os.path.exists(cache.path('b'))
+    assert os.path.exists(cache.path('c'))
+
+def test_file_cache_failed_write_leaves_nothing(tmp_path):
+    cache = FileCache(str(tmp_path), max_bytes=1000)
+
+    def broken(path):
+        with open(path, 'wb') as f:
+            f.write(b'puse')
+        raise OSError('diskas pilnas')
+
+    with pytest.raises(OSError):
+        cache.store(('raktas',), broken)
+
+    assert os.listdir(tmp_path) == []
+
+def test_load_statement_uses_parse_cache(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'PARSE_CACHE_FOLDER': str(tmp_path / 'cache'),
+    }, testing=True)
+    stream = io.BytesIO()
+    pd.DataFrame({'Data': ['2024-01-01'], 'Suma': [10.5], 'Kita': ['x']}).to_excel(stream, index=False)
+    content = stream.getvalue()
+
+    with app.app_context():
+        first = load_statement(FileStorage(io.BytesIO(content), 'a.xlsx'), 'bankas', 'bankas', ['Data', 'Suma'])
+        with patch('sheetsift.cache.read_statement') as read:
+            second = load_statement(FileStorage(io.BytesIO(content), 'b.xlsx'), 'bankas', 'bankas', ['Data', 'Suma'])
+            read.assert_not_called()
+            load_statement(FileStorage(io.BytesIO(content), 'c.xlsx'), 'bankas', 'kitas', ['Data'])
+            read.assert_called_once()
+
+    pd.testing.assert_frame_equal(first, second)
+    assert list(second.columns) == ['Data', 'Suma']
+
+def test_unreadable_parse_cache_entry_is_parsed_again(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'PARSE_CACHE_FOLDER': str(tmp_path / 'cache'),
+    }, testing=True)
+    stream = io.BytesIO()
+    pd.DataFrame({'Data': ['2024-01-01'], 'Suma': [10.5]}).to_excel(stream, index=False)
+    content = stream.getvalue()
+
+    with app.app_context():
+        expected = load_statement(FileStorage(io.BytesIO(content), 'a.xlsx'), 'bankas', 'bankas', ['Data', 'Suma'])
+        [entry] = os.listdir(tmp_path / 'cache')
+        (tmp_path / 'cache' / entry).write_bytes(b'ne pickle')
+
+        for _ in range(2):
+            df = load_statement(FileStorage(io.BytesIO(content), 'a.xlsx'), 'bankas', 'bankas', ['Data', 'Suma'])
+            pd.testing.assert_frame_equal(df, expected)
+
+    # The broken entry was replaced by a good one
+    assert pd.read_pickle(tmp_path / 'cache' / entry).equals(expected)
+
+def test_load_statement_parses_in_worker_pool():
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'PARSE_WORKERS': 2,
+    }, testing=True)
+    stream = io.BytesIO()
+    pd.DataFrame({'Data': ['2024-01-01'], 'Suma': [10.5], 'Kita': ['x']}).to_excel(stream, index=False)
+
+    with app.app_context():
+        df = load_statement(FileStorage(stream, 'a.xlsx'), 'bankas', 'bankas', ['Data', 'Suma'], parallel=True)
+    app.extensions['parse_pool'].shutdown()
+
+    assert df.to_dict('list') == {'Data': ['2024-01-01'], 'Suma': [10.5]}
+
+def test_single_upload_is_parsed_in_request_process():
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'PARSE_WORKERS': 2,
+    }, testing=True)
+    stream = io.BytesIO()
+    pd.DataFrame({'Data': ['2024-01-01'], 'Suma': [10.5]}).to_excel(stream, index=False)
+
+    with app.app_context(), patch('sheetsift.cache.run_in_pool') as run_in_pool:
+        df = load_statement(FileStorage(stream, 'a.xlsx'), 'bankas', 'bankas', ['Data', 'Suma'])
+    app.extensions['parse_pool'].shutdown()
+
+    run_in_pool.assert_not_called()
+    assert df.to_dict('list') == {'Data': ['2024-01-01'], 'Suma': [10.5]}
+
+def result_cache_app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'LOGIN_DISABLED': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'RESULT_FOLDER': str(tmp_path / 'results'),
+        'RESULT_CACHE_FOLDER': str(tmp_path / 'cache'),
+    }, testing=True)
+    os.makedirs(app.config['RESULT_FOLDER'])
+    return app
+
+def swedbank_statement():
+    stream = io.BytesIO()
+    pd.DataFrame({
+        'Data': ['2024-01-01', '2024-02-01'],
+        'Gavėjas / Siuntėjas': ['Jonas', 'Petras'],
+        'Gavėjo / Siuntėjo sąskaitos nr.': ['LT01', 'LT02'],
+        'Sąskaitos Nr.': ['LT99', 'LT99'],
+        'Detalės': ['Prekės', 'Paslaugos'],
+        'Operacijos tipas': ['K', 'D'],
+        'Suma': [100.0, 40.0],
+    }).to_excel(stream, index=False)
+    return stream.getvalue()
+
+def upload(app, content, **form):
+    data = {'bank': 'swedbank', 'file': (io.BytesIO(content), 'israsas.xlsx'), **form}
+    with app.test_client() as client:
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+        with client.session_transaction() as session:
+            return response, session['last_file']
+
+def test_repeat_upload_served_from_result_cache(tmp_path):
+    app = result_cache_app(tmp_path)
+    content = swedbank_statement()
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        first, first_path = upload(app, content)
+        with open(first_path, 'rb') as f:
+            expected = f.read()
+
+        with patch('sheetsift.analysis.load_statement') as load:
+            second, second_path = upload(app, content)
+            load.assert_not_called()
+
+    assert '/sekmingai' in first.headers['Location']
+    assert '/sekmingai' in second.headers['Location']
+    # Each request gets its own copy, under the same file name
+    assert first_path != second_path
+    assert os.path.basename(second_path) == 'Apdoroti_Išrasai_Swedbank.xlsx'
+    with open(second_path, 'rb') as f:
+        assert f.read() == expected
+
+def test_csv_results_are_cached_as_archives(tmp_path):
+    app = result_cache_app(tmp_path)
+    content = swedbank_statement()
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        _, first_path = upload(app, content, output='csv')
+        with patch('sheetsift.analysis.load_statement') as load:
+            _, second_path = upload(app, content, output='csv')
+            load.assert_not_called()
+        # Another format of the same upload is a separate entry
+        _, workbook_path = upload(app, content)
+
+    assert second_path.endswith('.csv.zip') and workbook_path.endswith('.xlsx')
+    assert read_bytes(second_path) == read_bytes(first_path)
+    entries = os.listdir(tmp_path / 'cache')
+    assert len(entries) == 2 and not any(name.endswith('.xlsx') for name in entries)
+
+def test_changed_specs_are_not_served_old_results(tmp_path):
+    from sheetsift.filters import swedbank
+    app = result_cache_app(tmp_path)
+    content = swedbank_statement()
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        upload(app, content)
+        with patch.dict(swedbank.SPECS['swedbank'], {'dayfirst': False}), \
+                patch('sheetsift.analysis.load_statement', wraps=load_statement) as load:
+            response, _ = upload(app, content)
+            load.assert_called_once()
+
+    assert '/sekmingai' in response.headers['Location']
+
+def test_spec_fingerprint_sees_the_end_of_long_patterns():
+    long = 'x' * 250
+    specs = {'bankas': {'purpose': {'column': 'Info', 'pattern': re.compile(long + '(?P<a>.+)'), 'group': 'a'}}}
+    edited = {'bankas': {'purpose': {'column': 'Info', 'pattern': re.compile(long + '(?P<a>.*)'), 'group': 'a'}}}
+    flagged = {'bankas': {'purpose': {'column': 'Info', 'pattern': re.compile(long + '(?P<a>.+)', re.I),
+                                      'group': 'a'}}}
+
+    assert spec_fingerprint(specs) == spec_fingerprint(
+        {'bankas': {'purpose': {'column': 'Info', 'pattern': re.compile(long + '(?P<a>.+)'), 'group': 'a'}}})
+    assert len({spec_fingerprint(specs), spec_fingerprint(edited), spec_fingerprint(flagged)}) == 3
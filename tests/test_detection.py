@@ -0,0 +1,119 @@
+import io
+import pandas as pd
+from unittest.mock import patch
+from sheetsift import db, bcrypt
+from sheetsift.models import User
+from sheetsift.detection import build_index, detect_format, detect_bank
+from sheetsift.routes import FORMAT_INDEX
+
+def login(client, app, user_id=50):
+    hashed_pw = bcrypt.generate_password_hash('testpass').decode('utf-8')
+    with app.app_context():
+        db.session.add(User(id=user_id, username=f'testuser{user_id}', password=hashed_pw))
+        db.session.commit()
+    client.post('/login', data={'username': f'testuser{user_id}', 'password': 'testpass'})
+
+def statement(df):
+    stream = io.BytesIO()
+    df.to_excel(stream, index=False)
+    stream.seek(0)
+    return stream
+
+def test_detect_format_prefers_most_specific_match():
+    index = build_index({
+        'revolut': {
+            'description': ['Started Date', 'Description'],
+            'counterparty': ['Started Date', 'Counterparty Name', 'Description'],
+        },
+        'kitas': {'kitas': ['Data', 'Suma']},
+    })
+
+    assert detect_format(['Started Date', 'Description', 'Counterparty Name', 'Fee'], index) == ('revolut', 'counterparty')
+    assert detect_format(['Description', 'Started Date'], index) == ('revolut', 'description')
+    assert detect_format(['Data', 'Suma', 'Valiuta'], index) == ('kitas', 'kitas')
+    assert detect_format(['Data', 'Description'], index) is None
+    assert detect_format([], index) is None
+
+def test_detect_format_tie_goes_to_first_registered():
+    index = build_index({
+        'pirmas': {'a': ['Data', 'Suma']},
+        'antras': {'b': ['Suma', 'Data']},
+    })
+
+    assert detect_format(['Suma', 'Data'], index) == ('pirmas', 'a')
+
+def test_detect_bank_reads_header_of_every_registered_bank():
+    headers = {
+        ('seb', 'new_seb'): ['DATA', 'MOKĖTOJO ARBA GAVĖJO PAVADINIMAS', 'SĄSKAITA', 'MOKĖJIMO PASKIRTIS',
+                             'SĄSKAITOS NR', 'DEBETAS/KREDITAS', 'SUMA', 'VALIUTA'],
+        ('swedbank', 'swedbank'): ['Data', 'Gavėjas / Siuntėjas', 'Gavėjo / Siuntėjo sąskaitos nr.',
+                                   'Sąskaitos Nr.', 'Detalės', 'Operacijos tipas', 'Suma'],
+        ('revolut', 'counterparty'): ['Started Date', 'Counterparty Name', 'Counterparty Account Nbr',
+                                      'Description', 'Amount (base currency)'],
+    }
+    for expected, columns in headers.items():
+        df = pd.DataFrame({column: ['x'] for column in columns})
+        assert detect_bank(statement(df), FORMAT_INDEX) == expected
+
+def test_analyze_without_bank_dispatches_detected_filter(client, app):
+    login(client, app)
+    df = pd.DataFrame({
+        'Started Date': ['2024-01-01'],
+        'Description': ['Mokėjimas'],
+        'Amount': [10.0],
+    })
+
+    with patch('sheetsift.routes.ANALYZERS', {'revolut': lambda: 'revolut'}):
+        response = client.post('/analyze', data={'bank': 'auto', 'file': (statement(df), 'israsas.xlsx')},
+                               content_type='multipart/form-data')
+
+    assert response.data == b'revolut'
+
+def test_analyze_statements_of_several_banks_together(client, app):
+    login(client, app, user_id=53)
+    swedbank = pd.DataFrame({
+        'Data': ['2024-01-05', '2024-02-10'],
+        'Gavėjas / Siuntėjas': ['Jonas', 'Maxima'],
+        'Gavėjo / Siuntėjo sąskaitos nr.': ['LT01', 'LT02'],
+        'Sąskaitos Nr.': ['LT99', 'LT99'],
+        'Detalės': ['Alga', 'Prekės'],
+        'Operacijos tipas': ['įplaukos', 'išlaidos'],
+        'Suma': [1000.0, 45.5],
+    })
+    revolut = pd.DataFrame({
+        'Started Date': ['2024-03-01'],
+        'Description': ['Netflix'],
+        'Amount': [-12.99],
+    })
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        data = {'file': [(statement(swedbank), 'swedbank.xlsx'), (statement(revolut), 'revolut.xlsx')]}
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+
+    assert '/sekmingai' in response.headers['Location']
+    with client.session_transaction() as session:
+        sheets = pd.read_excel(session['last_file'], sheet_name=None)
+    assert sheets['Išlaidos'][['ASMENS SĄSKAITA', 'GAVĖJAS', 2024]].values.tolist() == [
+        ['LT99', 'Maxima', 45.5], ['Revolut', 'Netflix', 12.99]]
+    assert sheets['Išlaidos']['GAVĖJO SĄSKAITA'].tolist()[1] == 'Sąskaita nenurodyta'
+    assert sheets['Bendra'].iloc[:, 0].tolist() == [
+        'LT99 Bendros Pajamos', 'LT99 Bendros Išlaidos', 'Revolut Bendros Pajamos', 'Revolut Bendros Išlaidos']
+
+def test_analyze_without_bank_unknown_header(client, app):
+    login(client, app, user_id=51)
+    df = pd.DataFrame({'Nežinomas': [1]})
+
+    response = client.post('/analyze', data={'file': (statement(df), 'israsas.xlsx')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 302
+    assert '/error' in response.headers['Location']
+
+def test_analyze_without_bank_not_a_workbook(client, app):
+    login(client, app, user_id=52)
+
+    response = client.post('/analyze', data={'file': (io.BytesIO(b'ne excel'), 'israsas.xlsx')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 302
+    assert '/error' in response.headers['Location']
@@ -9,12 +9,12 @@ from unittest.mock import patch
 import time
 
 @pytest.fixture
-def client():
+def client(tmp_path):
     app = create_app({
         'TESTING': True,
         'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
         'UPLOAD_FOLDER': 'tests/uploads',
-        'RESULT_FOLDER': 'tests/results'
+        'RESULT_FOLDER': str(tmp_path / 'results')
     }, testing=True)
 
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -130,7 +130,7 @@ def test_citadele_en_account_format(client):
         tmp_path = tmp_file.name
     df.to_excel(tmp_path, index=False)
 
-    with patch('sheetsift.filters.citadele.schedule_file_deletion') as mock_delete:
+    with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
         with open(tmp_path, 'rb') as f:
             data = {'file': (f, 'testas.xlsx'), 'bank': 'citadele'}
             response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -170,7 +170,7 @@ def test_citadele_en_iban_format(client):
     tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
     df.to_excel(tmp_file.name, index=False)
 
-    with patch('sheetsift.filters.citadele.schedule_file_deletion') as mock_delete:
+    with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
         with open(tmp_file.name, 'rb') as f:
             data = {'file': (f, 'testas.xlsx'), 'bank': 'citadele'}
             response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -208,7 +208,7 @@ def test_citadele_lt_format(client):
     tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
     df.to_excel(tmp_file.name, index=False)
 
-    with patch('sheetsift.filters.citadele.schedule_file_deletion') as mock_delete:
+    with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
         with open(tmp_file.name, 'rb') as f:
             data = {'file': (f, 'testas.xlsx'), 'bank': 'citadele'}
             response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -616,7 +616,7 @@ def test_luminor_success(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.luminor.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas.xlsx'), 'bank': 'luminor'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -875,7 +875,7 @@ def test_paysera_debit_only(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.paysera.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas.xlsx'), 'bank': 'paysera'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -912,7 +912,7 @@ def test_paysera_credit_only(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.paysera.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas.xlsx'), 'bank': 'paysera'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -982,7 +982,7 @@ def test_paysera_multi_years_pivot(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.paysera.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas.xlsx'), 'bank': 'paysera'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -1018,7 +1018,7 @@ def test_revolut_counterparty_format(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.revolut.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas.xlsx'), 'bank': 'revolut'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -1057,7 +1057,7 @@ def test_revolut_started_date_description_amount_format(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.revolut.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas.xlsx'), 'bank': 'revolut'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -1205,7 +1205,7 @@ def test_seb_old_format(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.seb.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas_seb_old.xlsx'), 'bank': 'seb'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -1243,7 +1243,7 @@ def test_seb_new_format(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.seb.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas_seb_new.xlsx'), 'bank': 'seb'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -1358,7 +1358,7 @@ def test_siauliu_success(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.siauliu.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'siauliu_test.xlsx'), 'bank': 'siauliubankas'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data',
@@ -1482,7 +1482,7 @@ def test_swedbank_success(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.swedbank.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'swedbank_test.xlsx'), 'bank': 'swedbank'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data', follow_redirects=False)
@@ -1498,6 +1498,106 @@ def test_swedbank_success(client):
     finally:
         os.remove(tmp_path)
 
+def test_swedbank_monthly_granularity(client):
+    from sheetsift.models import User
+    from sheetsift import bcrypt
+    hashed_pw = bcrypt.generate_password_hash('testpass').decode('utf-8')
+    db.session.add(User(username='testuser_men', password=hashed_pw))
+    db.session.commit()
+    client.post('/login', data={'username': 'testuser_men', 'password': 'testpass'})
+
+    df = pd.DataFrame({
+        'Data': ['2024-01-15', '2024-03-02', '2024-03-20'],
+        'Gavėjas / Siuntėjas': ['Jonas', 'Jonas', 'Petras'],
+        'Gavėjo / Siuntėjo sąskaitos nr.': ['LT01', 'LT01', 'LT02'],
+        'Sąskaitos Nr.': ['LT99', 'LT99', 'LT99'],
+        'Detalės': ['Alga', 'Alga', 'Nuoma'],
+        'Operacijos tipas': ['įplaukos', 'įplaukos', 'išlaidos'],
+        'Suma': [100.0, 50.0, 30.0]
+    })
+    stream = io.BytesIO()
+    df.to_excel(stream, index=False)
+    stream.seek(0)
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        data = {'file': (stream, 'swedbank.xlsx'), 'bank': 'swedbank', 'granularity': 'month'}
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+
+    assert '/sekmingai' in response.location
+    with client.session_transaction() as session:
+        sheets = pd.read_excel(session['last_file'], sheet_name=None)
+    assert list(sheets['Pajamos'].columns) == ['ASMENS SĄSKAITA', 'MOKĖTOJAS', 'MOKĖTOJO SĄSKAITA', '2024-01',
+                                               '2024-03', 'MOKĖJIMO PASKIRTIS']
+    assert sheets['Bendra'].iloc[0].tolist() == ['LT99 Bendros Pajamos', 100, 50, 150]
+
+def test_swedbank_csv_output(client):
+    from sheetsift.models import User
+    from sheetsift import bcrypt
+    import zipfile
+    hashed_pw = bcrypt.generate_password_hash('testpass').decode('utf-8')
+    db.session.add(User(username='testuser_csv', password=hashed_pw))
+    db.session.commit()
+    client.post('/login', data={'username': 'testuser_csv', 'password': 'testpass'})
+
+    df = pd.DataFrame({
+        'Data': ['2024-01-15'],
+        'Gavėjas / Siuntėjas': ['Jonas'],
+        'Gavėjo / Siuntėjo sąskaitos nr.': ['LT01'],
+        'Sąskaitos Nr.': ['LT99'],
+        'Detalės': ['Alga'],
+        'Operacijos tipas': ['įplaukos'],
+        'Suma': [100.0]
+    })
+    stream = io.BytesIO()
+    df.to_excel(stream, index=False)
+    stream.seek(0)
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        data = {'file': (stream, 'swedbank.xlsx'), 'bank': 'swedbank', 'output': 'csv'}
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+
+    assert '/sekmingai' in response.location
+    with client.session_transaction() as session:
+        result_path = session['last_file']
+    assert os.path.basename(result_path) == 'Apdoroti_Išrasai_Swedbank.csv.zip'
+    with zipfile.ZipFile(result_path) as archive:
+        assert archive.read('Pajamos.csv').decode('utf-8').splitlines()[1] == 'LT99,Jonas,LT01,100.0,Alga'
+
+@pytest.mark.parametrize('purposes, expected', [
+    ('1', 'Alga (2) ||\nkiti (1)'),
+    # Counts below 1 keep every purpose
+    ('-1', 'Alga ||\nPremija'),
+])
+def test_swedbank_top_purposes(client, purposes, expected):
+    from sheetsift.models import User
+    from sheetsift import bcrypt
+    hashed_pw = bcrypt.generate_password_hash('testpass').decode('utf-8')
+    db.session.add(User(username=f'testuser_top{purposes}', password=hashed_pw))
+    db.session.commit()
+    client.post('/login', data={'username': f'testuser_top{purposes}', 'password': 'testpass'})
+
+    df = pd.DataFrame({
+        'Data': ['2024-01-15', '2024-03-02', '2024-03-20'],
+        'Gavėjas / Siuntėjas': ['Jonas', 'Jonas', 'Jonas'],
+        'Gavėjo / Siuntėjo sąskaitos nr.': ['LT01', 'LT01', 'LT01'],
+        'Sąskaitos Nr.': ['LT99', 'LT99', 'LT99'],
+        'Detalės': ['Premija', 'Alga', 'Alga'],
+        'Operacijos tipas': ['įplaukos', 'įplaukos', 'įplaukos'],
+        'Suma': [100.0, 50.0, 30.0]
+    })
+    stream = io.BytesIO()
+    df.to_excel(stream, index=False)
+    stream.seek(0)
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        data = {'file': (stream, 'swedbank.xlsx'), 'bank': 'swedbank', 'purposes': purposes}
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+
+    assert '/sekmingai' in response.location
+    with client.session_transaction() as session:
+        pajamos = pd.read_excel(session['last_file'], sheet_name='Pajamos')
+    assert pajamos['MOKĖJIMO PASKIRTIS'].tolist() == [expected]
+
 def test_swedbank_missing_columns_redirects(client):
     from sheetsift.models import User
     from sheetsift import bcrypt
@@ -1597,7 +1697,7 @@ def test_citadele_extract_name_returns_default(client):
     df.to_excel(tmp_path, index=False)
 
     try:
-        with patch('sheetsift.filters.citadele.schedule_file_deletion') as mock_delete:
+        with patch('sheetsift.analysis.schedule_file_deletion') as mock_delete:
             with open(tmp_path, 'rb') as f:
                 data = {'file': (f, 'testas_extractname.xlsx'), 'bank': 'citadele'}
                 response = client.post('/analyze', data=data, content_type='multipart/form-data')
@@ -1614,4 +1714,30 @@ def test_citadele_extract_name_returns_default(client):
 
             mock_delete.assert_called_once()
     finally:
-        os.remove(tmp_path)
\ No newline at end of file
+        os.remove(tmp_path)
+
+def test_siauliu_extract_info_fields_in_any_order():
+    from sheetsift.filters.siauliu import SPECS
+    from sheetsift.specs import resolve_field
+
+    texts = pd.Series([
+        'MOKĖTOJAS: Jonas \nLT123456789012345678\nMokėjimo paskirtis: Nuoma',
+        'MOK. PASKIRTIS：Prekės\nGAVĖJAS:\n  UAB Ąžuolas',
+        'Be jokių laukų',
+        '',
+    ])
+
+    spec = SPECS['siauliu']
+    df = pd.DataFrame({'Mokėjimo paskirtis': texts})
+    fields = {
+        'MOKĖTOJAS': spec['counterparty']['credit'],
+        'GAVĖJAS': spec['counterparty']['debit'],
+        'SĄSKAITOS NUMERIS': spec['counterparty_account'],
+        'MOKĖJIMO PASKIRTIS': spec['purpose'],
+    }
+    info = {name: resolve_field(field, df) for name, field in fields.items()}
+
+    assert info['MOKĖTOJAS'].tolist() == ['Jonas', 'Nenurodytas', 'Nenurodytas', 'Nenurodytas']
+    assert info['GAVĖJAS'].tolist() == ['Nenurodytas', 'UAB Ąžuolas', 'Nenurodytas', 'Nenurodytas']
+    assert info['SĄSKAITOS NUMERIS'].tolist() == ['LT123456789012345678'] + ['Sąskaita nenurodyta'] * 3
+    assert info['MOKĖJIMO PASKIRTIS'].tolist() == ['Nuoma', 'Prekės', 'Be paskirties', 'Be paskirties']
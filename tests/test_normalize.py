@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from sheetsift.normalize import signed_indicator, signed_columns, split_signed
+
+def test_signed_indicator():
+    amount = pd.Series([100.0, -40.0, 0.0, 25.0])
+    indicator = pd.Series(pd.Categorical(['CR', 'DR', 'CR', 'X']))
+
+    signed = signed_indicator(amount, indicator, 'CR', 'DR')
+
+    assert signed.tolist()[:3] == [100.0, -40.0, 0.0]
+    assert np.isnan(signed[3])
+
+def test_split_signed():
+    credit, debit = split_signed(pd.Series([10.5, -3.0, 0.0, np.nan]))
+
+    assert credit.isna().tolist() == [False, True, True, True]
+    assert debit.isna().tolist() == [True, False, True, True]
+    assert (credit[0], debit[1]) == (10.5, 3.0)
+
+def test_signed_columns_treats_empty_and_zero_as_other_side():
+    signed = signed_columns(pd.Series([100.0, 0.0, None, 'x']), pd.Series([0.0, -50.0, 20.0, None]))
+
+    assert signed.tolist() == [100.0, -50.0, -20.0, 0.0]
+
+def test_signed_columns_keeps_cents_integral():
+    signed = signed_columns(pd.Series([1050, None], dtype='Int64'), pd.Series([None, 300], dtype='Int64'))
+
+    assert str(signed.dtype) == 'Int64'
+    assert signed.tolist() == [1050, -300]
@@ -0,0 +1,80 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sheetsift.parsing import parse_dates, parse_money, map_unique
+
+def test_parse_dates_mixed_inputs():
+    values = pd.Series([
+        '2024-01-05', '05.02.2024', datetime(2023, 1, 1, 8, 30), 45000, '45000', 20240131,
+        None, 'ne data', '', 45000.5, 20241399, '31/12/2023', np.nan,
+    ], dtype=object)
+
+    result = parse_dates(values, dayfirst=True)
+
+    assert result.tolist() == [
+        pd.Timestamp('2024-01-05'), pd.Timestamp('2024-02-05'), pd.Timestamp('2023-01-01 08:30'),
+        pd.Timestamp('2023-03-15'), pd.Timestamp('2023-03-15'), pd.Timestamp('2024-01-31'),
+        pd.NaT, pd.NaT, pd.NaT, pd.Timestamp('2023-03-15 12:00'), pd.NaT,
+        pd.Timestamp('2023-12-31'), pd.NaT,
+    ]
+
+def test_parse_dates_keeps_datetime_columns():
+    values = pd.Series(pd.to_datetime(['2024-01-01', None]))
+
+    pd.testing.assert_series_equal(parse_dates(values), values)
+
+def test_parse_dates_empty_and_all_missing():
+    assert parse_dates(pd.Series([], dtype=object)).empty
+    assert parse_dates(pd.Series([np.nan, np.nan])).isna().all()
+
+def test_map_unique_parses_each_value_once():
+    seen = []
+
+    def parse(values):
+        seen.extend(values)
+        return values.str.upper()
+
+    values = pd.Series(['a', 'b', None, 'a', 'b', 'a'], index=[10, 11, 12, 13, 14, 15])
+    result = map_unique(values, parse)
+
+    assert seen == ['a', 'b']
+    assert result.index.tolist() == [10, 11, 12, 13, 14, 15]
+    assert result.tolist()[:2] == ['A', 'B'] and pd.isna(result[12]) and result.tolist()[3:] == ['A', 'B', 'A']
+
+def test_map_unique_spreads_frames():
+    values = pd.Series(['x1', 'y2', 'x1'])
+    result = map_unique(values, lambda u: u.str.extract(r'(?P<raide>\w)(?P<skaicius>\d)'))
+
+    assert result['raide'].tolist() == ['x', 'y', 'x']
+    assert result['skaicius'].tolist() == ['1', '2', '1']
+
+def test_parse_money_text_and_numbers():
+    values = pd.Series([
+        '1 234,56 EUR', '-12.50', '€1,234.00', '1.234.567,89', '2,500', '−7,1 USD', 'EUR -3,00',
+        12.345, 100, None, 'nėra', '', np.inf,
+    ], dtype=object)
+
+    result = parse_money(values)
+
+    assert str(result['cents'].dtype) == 'Int64'
+    assert result['cents'].tolist() == [
+        123456, -1250, 123400, 123456789, 250000, -710, -300, 1234, 10000, pd.NA, pd.NA, pd.NA, pd.NA,
+    ]
+    assert result['currency'].fillna('').tolist()[:7] == ['EUR', '', 'EUR', '', '', 'USD', 'EUR']
+
+def test_parse_money_sign_before_currency_and_lowercase_code():
+    result = parse_money(pd.Series(['-€5.00', '+ EUR 5,00', '12,50 eur', 'usd −1.5', 'Eur 7']))
+
+    assert result['cents'].tolist() == [-500, 500, 1250, -150, 700]
+    assert result['currency'].tolist() == ['EUR', 'EUR', 'EUR', 'USD', 'EUR']
+
+def test_parse_money_reads_text_the_same_with_or_without_currency():
+    values = pd.Series(['2.500', '2.500 EUR', '2,500', '2.50', '2.50 EUR', 2.5], dtype=object)
+
+    assert parse_money(values)['cents'].tolist() == [250000, 250000, 250000, 250, 250, 250]
+
+def test_parse_money_sums_exactly():
+    cents = parse_money(pd.Series([0.1] * 10 + ['0,2'] * 5))['cents']
+
+    assert cents.sum() == 200
+    assert cents.sum() / 100 == 2.0
@@ -0,0 +1,188 @@
+import io
+import zipfile
+import pandas as pd
+import numpy as np
+import pytest
+from openpyxl import Workbook
+from sheetsift.reader import iter_batches, iter_rows, read_statement, sniff_format, fill_category
+
+def write_statement(tmp_path, df, name='israsas.xlsx'):
+    path = tmp_path / name
+    df.to_excel(path, index=False)
+    return str(path)
+
+def test_read_statement_matches_read_excel(tmp_path):
+    df = pd.DataFrame({
+        'Data': pd.to_datetime(['2024-01-01', '2024-02-01', None]),
+        'Mokėtojas': ['Jonas', None, 'Petras'],
+        'Suma': [100.5, -20, None],
+        'Kiekis': [1, 2, 3],
+        'Tuščias': [None, None, None],
+    })
+    path = write_statement(tmp_path, df)
+
+    result = read_statement(path)
+
+    pd.testing.assert_frame_equal(result, pd.read_excel(path), check_dtype=False)
+    assert result['Suma'].dtype == np.float64
+    assert result['Kiekis'].dtype == np.int64
+    assert result['Tuščias'].isna().all()
+
+def test_read_statement_from_stream(tmp_path):
+    path = write_statement(tmp_path, pd.DataFrame({'A': ['x', 'y']}))
+    with open(path, 'rb') as f:
+        stream = io.BytesIO(f.read())
+    stream.seek(5)
+
+    result = read_statement(stream)
+
+    assert list(result['A']) == ['x', 'y']
+
+def test_iter_batches_splits_rows(tmp_path):
+    df = pd.DataFrame({'A': range(25), 'B': [f'eilutė {i}' for i in range(25)]})
+    path = write_statement(tmp_path, df)
+
+    batches = list(iter_batches(path, batch_size=10))
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert list(pd.concat(batches, ignore_index=True)['A']) == list(range(25))
+
+def test_read_statement_keeps_inner_blank_rows_and_drops_trailing(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['A', 'B'])
+    ws.append(['x', 1])
+    ws.append([])
+    ws.append(['y', 2])
+    ws['A10'].value = None
+    path = tmp_path / 'tarpai.xlsx'
+    wb.save(path)
+
+    result = read_statement(str(path))
+
+    assert len(result) == 3
+    assert result.iloc[1].isna().all()
+
+def test_read_statement_duplicate_and_missing_headers(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['Suma', None, 'Suma'])
+    ws.append([1, 2, 3])
+    path = tmp_path / 'antrastes.xlsx'
+    wb.save(path)
+
+    result = read_statement(str(path))
+
+    assert list(result.columns) == ['Suma', 'Unnamed: 1', 'Suma.1']
+
+def test_read_statement_inline_strings(tmp_path):
+    path = write_statement(tmp_path, pd.DataFrame({'A': ['x']}))
+    with zipfile.ZipFile(path) as archive:
+        files = {name: archive.read(name) for name in archive.namelist()}
+
+    sheet = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        '<row r="1"><c r="A1" t="inlineStr"><is><t>Paskirtis</t></is></c></row>'
+        '<row r="2"><c r="A2" t="inlineStr"><is><r><t>Už </t></r><r><t>prekes</t></r></is></c></row>'
+        '</sheetData></worksheet>'
+    ).encode('utf-8')
+    files['xl/worksheets/sheet1.xml'] = sheet
+    inline_path = tmp_path / 'inline.xlsx'
+    with zipfile.ZipFile(inline_path, 'w') as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+
+    assert read_statement(str(inline_path))['Paskirtis'].tolist() == ['Už prekes']
+
+def test_read_statement_empty_workbook(tmp_path):
+    path = write_statement(tmp_path, pd.DataFrame())
+
+    assert read_statement(path).empty
+    assert list(iter_rows(path)) == []
+
+def test_read_statement_not_a_workbook():
+    with pytest.raises(zipfile.BadZipFile):
+        read_statement(io.BytesIO(b'not an excel file'))
+
+def test_read_statement_projects_columns(tmp_path):
+    df = pd.DataFrame({f'Stulpelis {i}': [i, i + 1] for i in range(30)})
+    df['Data'] = ['2024-01-01', '2024-01-02']
+    df['Suma'] = [10.5, -3]
+    path = write_statement(tmp_path, df)
+
+    result = read_statement(path, columns=['Suma', 'Data', 'Nėra'])
+
+    assert list(result.columns) == ['Data', 'Suma']
+    pd.testing.assert_frame_equal(result, pd.read_excel(path, usecols=['Data', 'Suma']), check_dtype=False)
+
+def test_read_statement_projection_across_chunks(tmp_path, monkeypatch):
+    import sheetsift.reader as reader
+    monkeypatch.setattr(reader, 'CHUNK_SIZE', 256)
+    df = pd.DataFrame({
+        'A': [f'nereikalinga {i}' for i in range(500)],
+        'B': range(500),
+        'C': [f'reikalinga {i}' for i in range(500)],
+    })
+    path = write_statement(tmp_path, df)
+
+    result = read_statement(path, columns=['B', 'C'])
+
+    pd.testing.assert_frame_equal(result, df[['B', 'C']], check_dtype=False)
+
+def test_read_statement_nrows(tmp_path):
+    path = write_statement(tmp_path, pd.DataFrame({'A': range(100), 'B': ['x'] * 100}))
+
+    header = read_statement(path, nrows=0)
+    head = read_statement(path, nrows=3)
+
+    assert list(header.columns) == ['A', 'B']
+    assert header.empty
+    assert list(head['A']) == [0, 1, 2]
+
+def test_sniff_format_picks_first_matching_format(tmp_path):
+    formats = {
+        'counterparty': ['Started Date', 'Counterparty Name', 'Description'],
+        'description': ['Started Date', 'Description'],
+    }
+    full = write_statement(tmp_path, pd.DataFrame({
+        'Started Date': ['2024-01-01'], 'Counterparty Name': ['Jonas'], 'Description': ['x'],
+    }), 'full.xlsx')
+    short = write_statement(tmp_path, pd.DataFrame({
+        'Started Date': ['2024-01-01'], 'Description': ['x'],
+    }), 'short.xlsx')
+    other = write_statement(tmp_path, pd.DataFrame({'Kita': [1]}), 'other.xlsx')
+
+    assert sniff_format(full, formats) == 'counterparty'
+    assert sniff_format(short, formats) == 'description'
+    assert sniff_format(other, formats) is None
+
+def test_read_statement_declared_dtypes(tmp_path):
+    df = pd.DataFrame({
+        'Gavėjas': ['Petras', None, 'Ąžuolas', 'Jonas', 'Petras'],
+        'Sąskaita': ['LT1', 'LT2', 3, 'LT1', None],
+        'Suma': ['10,5', 2, None, 'x', 4.5],
+    })
+    path = write_statement(tmp_path, df)
+    dtypes = {'Gavėjas': 'category', 'Sąskaita': 'category', 'Suma': 'float64'}
+
+    result = read_statement(path, dtypes=dtypes, batch_size=2)
+
+    assert isinstance(result['Gavėjas'].dtype, pd.CategoricalDtype)
+    assert list(result['Gavėjas'].cat.categories) == ['Jonas', 'Petras', 'Ąžuolas']
+    assert result['Gavėjas'].tolist()[2:] == ['Ąžuolas', 'Jonas', 'Petras']
+    assert result['Gavėjas'].isna().sum() == 1
+    # Mixed text and numbers stay plain objects
+    assert not isinstance(result['Sąskaita'].dtype, pd.CategoricalDtype)
+    assert result['Suma'].dtype == np.float64
+    assert result['Suma'].tolist()[1] == 2.0
+    assert result['Suma'].isna().sum() == 3
+
+def test_fill_category_keeps_categories_sorted():
+    series = pd.Series(pd.Categorical(['Petras', None, 'Antanas']))
+
+    filled = fill_category(series, 'Nenurodytas')
+
+    assert filled.tolist() == ['Petras', 'Nenurodytas', 'Antanas']
+    assert list(filled.cat.categories) == ['Antanas', 'Nenurodytas', 'Petras']
+    assert fill_category(pd.Series(['a', None]), 'b').tolist() == ['a', 'b']
@@ -0,0 +1,315 @@
+import io
+import zipfile
+import pandas as pd
+import pytest
+from sheetsift.report import transactions, aggregate, join_distinct, period_codes, combine_transactions, \
+    merge_banks, build_report, write_report, output_name, cap_text, \
+    join_top
+import sheetsift.report as report
+
+def sample(**columns):
+    return transactions(
+        year=pd.Series([2023, 2023, 2024, 2024, 2024], dtype='Int16'),
+        counterparty=pd.Series(['Jonas', 'Jonas', 'Jonas', 'Petras', 'Petras']),
+        amount=pd.Series([1000, 250, -4000, 0, -125], dtype='Int64'),
+        **columns,
+    )
+
+def test_build_report_splits_and_sums_cents():
+    frame = sample(
+        counterparty_account=pd.Series(['LT01', 'LT01', 'LT01', 'LT02', 'LT02']),
+        purpose=pd.Series(['Alga', 'Premija', 'Nuoma', 'Nulis', 'Kava']),
+    )
+
+    credit, debit, summary = build_report(frame)
+
+    assert list(credit.columns) == ['MOKĖTOJAS', 'MOKĖTOJO SĄSKAITA', 2023, 'MOKĖJIMO PASKIRTIS']
+    assert credit.iloc[0].tolist() == ['Jonas', 'LT01', 12.5, 'Alga ||\nPremija']
+    assert list(debit.columns) == ['GAVĖJAS', 'GAVĖJO SĄSKAITA', 2024, 'MOKĖJIMO PASKIRTIS']
+    assert debit[2024].tolist() == [40.0, 1.25]
+    # The zero-amount row is on neither sheet
+    assert 'Nulis' not in debit['MOKĖJIMO PASKIRTIS'].tolist()
+
+    assert summary.index.tolist() == ['Bendros Pajamos', 'Bendros Išlaidos']
+    assert summary.loc['Bendros Pajamos'].tolist() == [12.5, 0, 12.5]
+    assert summary.loc['Bendros Išlaidos'].tolist() == [0, 41.25, 41.25]
+
+def test_build_report_keeps_currencies_apart():
+    frame = sample(account=pd.Series(['LT99'] * 5),
+                   currency=pd.Series(['EUR', 'USD', 'EUR', None, 'EUR']).astype('category'))
+
+    credit, debit, summary = build_report(frame)
+
+    assert list(credit.columns) == ['ASMENS SĄSKAITA', 'VALIUTA', 'MOKĖTOJAS', 2023]
+    assert credit[['VALIUTA', 2023]].values.tolist() == [['EUR', 10.0], ['USD', 2.5]]
+    assert summary.index.tolist() == [
+        'LT99 EUR Bendros Pajamos', 'LT99 EUR Bendros Išlaidos', 'LT99 USD Bendros Pajamos', 'LT99 USD Bendros Išlaidos',
+        'LT99 Valiuta nenurodyta Bendros Pajamos', 'LT99 Valiuta nenurodyta Bendros Išlaidos',
+    ]
+    assert summary['Viso'].tolist() == [10.0, 41.25, 2.5, 0, 0, 0]
+
+    # One currency throughout reads as none
+    single = build_report(sample(currency=pd.Series(['EUR'] * 5)))
+    unnamed = build_report(sample())
+    for table, expected in zip(single, unnamed):
+        pd.testing.assert_frame_equal(table, expected)
+
+def test_build_report_summarizes_each_own_account():
+    frame = sample(account=pd.Series(['LT99', 'LT88', 'LT99', 'LT88', 'LT88']))
+
+    credit, debit, summary = build_report(frame)
+
+    assert list(credit.columns) == ['ASMENS SĄSKAITA', 'MOKĖTOJAS', 2023]
+    assert summary.index.tolist() == [
+        'LT99 Bendros Pajamos', 'LT99 Bendros Išlaidos', 'LT88 Bendros Pajamos', 'LT88 Bendros Išlaidos',
+    ]
+    assert summary.loc['LT99 Bendros Išlaidos', 'Viso'] == 40.0
+    assert summary.loc['LT88 Bendros Išlaidos', 'Viso'] == 1.25
+
+def test_summary_keeps_accounts_without_dated_rows():
+    frame = sample(account=pd.Series(['LT99', 'LT88', 'LT99', 'LT77', 'LT88']))
+    frame.loc[3, 'METAI'] = pd.NA
+
+    summary = build_report(frame)[2]
+
+    assert summary.index.tolist()[4:] == ['LT77 Bendros Pajamos', 'LT77 Bendros Išlaidos']
+    assert summary.loc['LT77 Bendros Išlaidos'].tolist() == [0, 0, 0]
+    assert summary.loc['LT88 Bendros Pajamos'].tolist() == [2.5, 0, 2.5]
+
+def test_aggregate_matches_pivot_and_purposes():
+    rows = transactions(
+        year=pd.Series([2024, 2021, 2023, 2024, None, 2024], dtype='Int16'),
+        account=pd.Series(['LT1', 'LT2', 'LT2', 'LT2', 'LT2', 'LT2']),
+        counterparty=pd.Series(['Ą', 'Ą', 'c', 'a', 'b', 'a']),
+        purpose=pd.Series(['x', 'y', 'z', 'y', 'w', 'x']),
+        amount=pd.Series([100, 200, 300, 400, 500, 600], dtype='Int64'),
+    )
+    keys = ['ASMENS SĄSKAITA', 'MOKĖTOJAS/GAVĖJAS']
+
+    table = aggregate(rows, keys)
+
+    pivot = rows.pivot_table(index=keys, columns='METAI', values='SUMA', aggfunc='sum',
+                             fill_value=0, observed=True).div(100).reset_index()
+    purposes = rows.groupby(keys)['MOKĖJIMO PASKIRTIS'].apply(lambda x: ' ||\n'.join(sorted(set(x)))).reset_index()
+    expected = pd.merge(pivot, purposes, on=keys)
+    # 'b' has no dated row, so like pivot_table the counterparties of LT2 keep
+    # the order they first appear in rather than sorted order
+    assert table['MOKĖTOJAS/GAVĖJAS'].tolist() == ['Ą', 'Ą', 'a', 'c']
+    assert table.astype(object).values.tolist() == expected.astype(object).values.tolist()
+    assert table['MOKĖJIMO PASKIRTIS'].tolist()[2] == 'x ||\ny'
+
+def test_join_distinct_matches_sorted_set():
+    groups = [1, 0, 1, 1, -1, 0, 2]
+    values = pd.Series(['ž', 'b', 'Z', 'ž', 'x', None, 'a']).astype('category')
+
+    joined = join_distinct(groups, values, separator='|')
+
+    # The -1 row belongs to no group and missing strings are skipped
+    assert joined.to_dict() == {0: 'b', 1: 'Z|ž', 2: 'a'}
+
+def test_join_top_keeps_most_frequent_with_counts():
+    groups = [0, 0, 0, 0, 1, 1, -1, 0, 2]
+    values = pd.Series(['b', 'a', 'b', 'c', 'x', 'x', 'z', 'd', None])
+
+    joined = join_top(groups, values, 2, separator='|')
+
+    # Ties go alphabetically; group 2 has only a missing purpose
+    assert joined.to_dict() == {0: 'b (2)|a (1)|kiti (2)', 1: 'x (2)'}
+
+def test_build_report_with_top_purposes():
+    frame = sample(purpose=pd.Series(['Alga', 'Alga', 'Nuoma', 'Kava', 'Kava']))
+
+    credit, debit, _ = build_report(frame, purposes=1)
+
+    assert credit['MOKĖJIMO PASKIRTIS'].tolist() == ['Alga (2)']
+    assert debit['MOKĖJIMO PASKIRTIS'].tolist() == ['Nuoma (1)', 'Kava (1)']
+    assert build_report(frame)[0]['MOKĖJIMO PASKIRTIS'].tolist() == ['Alga']
+    with pytest.raises(ValueError):
+        build_report(frame, purposes=0)
+
+def statement(dates, counterparties, amounts, account=None):
+    return transactions(
+        date=pd.to_datetime(pd.Series(dates)),
+        year=pd.Series([2024] * len(dates), dtype='Int16'),
+        account=None if account is None else pd.Series([account] * len(dates)).astype('category'),
+        counterparty=pd.Series(counterparties).astype('category'),
+        amount=pd.Series(amounts, dtype='Int64'),
+    )
+
+def test_combine_transactions_counts_overlap_once():
+    first = statement(['2024-01-05', '2024-01-05', '2024-02-10'], ['Jonas', 'Jonas', 'Petras'], [500, 500, -300],
+                      account='LT99')
+    second = statement(['2024-02-10', '2024-01-05', '2024-03-01'], ['Petras', 'Jonas', 'Jonas'], [-300, 500, 700],
+                       account='LT99')
+
+    combined = combine_transactions([first, second])
+
+    # Both January payments stay, the one repeated by the second statement
+    # does not come back a third time
+    assert combined['SUMA'].tolist() == [500, 500, -300, 700]
+    assert list(combined.columns) == list(first.columns)
+
+def test_combine_transactions_keeps_equal_payments_of_other_accounts():
+    fee = (['2024-01-31', '2024-02-29'], ['Banko mokestis'] * 2, [-150, -150])
+
+    # Statements that name no own account may be of different accounts
+    unnamed = combine_transactions([statement(*fee), statement(*fee)])
+    assert unnamed['SUMA'].tolist() == [-150] * 4
+    assert build_report(unnamed)[1][2024].tolist() == [6.0]
+
+    named = combine_transactions([statement(*fee, account='LT11'), statement(*fee, account='LT22')])
+    assert named['ASMENS SĄSKAITA'].tolist() == ['LT11', 'LT11', 'LT22', 'LT22']
+
+    # Same account, but the February fee is outside the first statement
+    january = statement(['2024-01-31'], ['Banko mokestis'], [-150], account='LT11')
+    both = statement(['2024-01-31', '2024-02-29', '2024-02-29'], ['Banko mokestis'] * 3, [-150] * 3, account='LT11')
+    assert combine_transactions([january, both])['SUMA'].tolist() == [-150] * 3
+
+def test_combine_transactions_of_mixed_variants_keeps_every_row():
+    # Like Revolut's 'counterparty' and 'description' layouts: the second
+    # has no own account, counterparty account or purpose
+    named = sample(account=pd.Series(['LT99'] * 5), counterparty_account=pd.Series(['LT01'] * 5),
+                   purpose=pd.Series(['Alga'] * 5))
+    bare = transactions(year=named['METAI'], counterparty=pd.Series(['Netflix'] * 5), amount=named['SUMA'])
+
+    combined = combine_transactions([named, bare])
+    credit, debit, summary = build_report(combined)
+
+    assert list(combined.columns) == list(named.columns)
+    assert combined['ASMENS SĄSKAITA'].tolist()[5:] == ['Sąskaita nenurodyta'] * 5
+    assert combined['MOKĖJIMO PASKIRTIS'].tolist()[5:] == ['Be paskirties'] * 5
+    # Both statements' rows are on the sheets, and the sheets add up to Bendra
+    assert credit['MOKĖTOJAS'].tolist() == ['Jonas', 'Netflix']
+    assert credit[2023].sum() == summary.filter(like='Pajamos', axis=0)['Viso'].sum() == 25.0
+    assert debit[2024].sum() == summary.filter(like='Išlaidos', axis=0)['Viso'].sum() == 82.5
+
+def test_merge_banks_labels_accounts_and_fills_missing_fields():
+    named = sample(account=pd.Series(['LT99'] * 5), purpose=pd.Series(['Alga'] * 5))
+
+    merged = merge_banks({'SEB': named, 'Revolut': sample()})
+
+    assert merged['ASMENS SĄSKAITA'].tolist() == ['LT99'] * 5 + ['Revolut'] * 5
+    assert merged['MOKĖJIMO PASKIRTIS'].tolist()[5:] == ['Be paskirties'] * 5
+    assert merged['MOKĖTOJO/GAVĖJO SĄSKAITA'].tolist() == ['Sąskaita nenurodyta'] * 10
+
+def test_merge_banks_fills_empty_cells_per_row():
+    # A bank whose statements name the own account on some rows only
+    partly = sample(account=pd.Series(['LT99', None, 'LT99', None, 'LT99']).astype('category'),
+                    purpose=pd.Series(['Alga', None, 'Nuoma', 'Kava', None]))
+
+    merged = merge_banks({'Citadele': partly, 'Revolut': sample()})
+    credit, debit, summary = build_report(merged)
+
+    assert merged['ASMENS SĄSKAITA'].tolist()[:5] == ['LT99', 'Citadele', 'LT99', 'Citadele', 'LT99']
+    assert merged['MOKĖJIMO PASKIRTIS'].tolist()[:5] == ['Alga', 'Be paskirties', 'Nuoma', 'Kava', 'Be paskirties']
+    assert credit[2023].sum() == summary.filter(like='Pajamos', axis=0)['Viso'].sum() == 25.0
+    assert debit[2024].sum() == summary.filter(like='Išlaidos', axis=0)['Viso'].sum() == 82.5
+
+def test_period_codes_sort_in_time_order():
+    frame = sample(month=pd.Series([12, 1, 1, 4, 10], dtype='Int8'))
+
+    assert period_codes(frame, 'year').tolist() == [2023, 2023, 2024, 2024, 2024]
+    assert period_codes(frame, 'quarter').tolist() == [8095, 8092, 8096, 8097, 8099]
+    assert period_codes(frame, 'month').tolist() == [24287, 24276, 24288, 24291, 24297]
+
+def test_build_report_by_month_and_quarter():
+    frame = sample(month=pd.Series([12, 1, 1, 4, 10], dtype='Int8'))
+
+    credit, debit, summary = build_report(frame, 'month')
+
+    assert list(credit.columns) == ['MOKĖTOJAS', '2023-01', '2023-12']
+    assert credit.iloc[0].tolist() == ['Jonas', 2.5, 10.0]
+    assert list(debit.columns) == ['GAVĖJAS', '2024-01', '2024-10']
+    assert list(summary.columns) == ['2023-01', '2023-12', '2024-01', '2024-04', '2024-10', 'Viso']
+    assert summary.loc['Bendros Išlaidos'].tolist() == [0, 0, 40.0, 0, 1.25, 41.25]
+
+    credit, debit, summary = build_report(frame, 'quarter')
+    assert list(credit.columns) == ['MOKĖTOJAS', '2023 Q1', '2023 Q4']
+    assert list(summary.columns) == ['2023 Q1', '2023 Q4', '2024 Q1', '2024 Q2', '2024 Q4', 'Viso']
+
+def test_write_report_sheets(tmp_path):
+    path = tmp_path / 'ataskaita.xlsx'
+    write_report(path, sample())
+
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ['Pajamos', 'Išlaidos', 'Bendra']
+    assert sheets['Pajamos']['MOKĖTOJAS'].tolist() == ['Jonas']
+
+def test_streaming_writer_matches_to_excel(tmp_path):
+    frame = sample(account=pd.Series(['LT99', 'LT88', 'LT99', 'LT88', 'LT88']),
+                   purpose=pd.Series(['Alga', None, 'Nuoma', 'Nulis', 'Kava']))
+    write_report(tmp_path / 'a.xlsx', frame, streaming=False)
+    write_report(tmp_path / 'b.xlsx', frame, streaming=True)
+
+    expected = pd.read_excel(tmp_path / 'a.xlsx', sheet_name=None)
+    streamed = pd.read_excel(tmp_path / 'b.xlsx', sheet_name=None)
+    assert list(streamed) == ['Pajamos', 'Išlaidos', 'Bendra']
+    for name in expected:
+        pd.testing.assert_frame_equal(streamed[name], expected[name])
+    assert streamed['Bendra'].iloc[:, 0].tolist()[0] == 'LT99 Bendros Pajamos'
+
+def test_cap_text_counts_values_left_out():
+    text = ' ||\n'.join(['Alga', 'Nuoma', 'Premija', 'Kava'])
+
+    assert cap_text(text, len(text)) == text
+    capped = cap_text(text, 30)
+    assert capped == 'Alga ||\nNuoma ||\n... ir dar 2'
+    assert len(capped) <= 30
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_oversized_sheets_are_split_and_cells_capped(tmp_path, monkeypatch, streaming):
+    monkeypatch.setattr(report, 'EXCEL_ROWS', 2)
+    monkeypatch.setattr(report, 'EXCEL_CELL_CHARS', 20)
+    frame = transactions(
+        year=pd.Series([2024] * 5, dtype='Int16'),
+        counterparty=pd.Series(['A', 'B', 'C', 'D', 'A']),
+        purpose=pd.Series(['Alga', 'Alga', 'Alga', 'Alga', 'Premija už metus']),
+        amount=pd.Series([100] * 5, dtype='Int64'),
+    )
+
+    write_report(tmp_path / 'a.xlsx', frame, streaming=streaming)
+
+    sheets = pd.read_excel(tmp_path / 'a.xlsx', sheet_name=None)
+    assert list(sheets) == ['Pajamos_1', 'Pajamos_2', 'Išlaidos', 'Bendra']
+    assert sheets['Pajamos_1']['MOKĖTOJAS'].tolist() == ['A', 'B']
+    assert sheets['Pajamos_2']['MOKĖTOJAS'].tolist() == ['C', 'D']
+    assert sheets['Pajamos_1']['MOKĖJIMO PASKIRTIS'].tolist()[0] == 'Alga ||\n... ir dar 1'
+
+def test_csv_and_ndjson_outputs(tmp_path):
+    frame = sample(account=pd.Series(['LT99', 'LT88', 'LT99', 'LT88', 'LT88']))
+    credit, debit, summary = build_report(frame)
+
+    write_report(tmp_path / 'a.csv.zip', frame, output='csv')
+    with zipfile.ZipFile(tmp_path / 'a.csv.zip') as archive:
+        assert archive.namelist() == ['Pajamos.csv', 'Išlaidos.csv', 'Bendra.csv']
+        pajamos = pd.read_csv(archive.open('Pajamos.csv'))
+        bendra = pd.read_csv(archive.open('Bendra.csv'))
+    assert pajamos.values.tolist() == credit.values.tolist()
+    assert bendra['EILUTĖ'].tolist() == summary.index.tolist()
+
+    write_report(tmp_path / 'a.ndjson.zip', frame, output='ndjson')
+    with zipfile.ZipFile(tmp_path / 'a.ndjson.zip') as archive:
+        islaidos = pd.read_json(io.BytesIO(archive.read('Išlaidos.ndjson')), lines=True)
+    assert islaidos['GAVĖJAS'].tolist() == debit['GAVĖJAS'].tolist()
+
+def test_parquet_output(tmp_path):
+    pytest.importorskip('pyarrow')
+    write_report(tmp_path / 'a.parquet.zip', sample(), output='parquet')
+    with zipfile.ZipFile(tmp_path / 'a.parquet.zip') as archive:
+        bendra = pd.read_parquet(io.BytesIO(archive.read('Bendra.parquet')))
+    assert bendra['EILUTĖ'].tolist() == ['Bendros Pajamos', 'Bendros Išlaidos']
+
+def test_output_name():
+    assert output_name('Apdoroti_Israsai_SEB.xlsx') == 'Apdoroti_Israsai_SEB.xlsx'
+    assert output_name('Apdoroti_Israsai_SEB.xlsx', 'csv') == 'Apdoroti_Israsai_SEB.csv.zip'
+    with pytest.raises(ValueError):
+        output_name('Apdoroti_Israsai_SEB.xlsx', 'pdf')
+
+def test_parquet_is_refused_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(report, 'HAS_PYARROW', False)
+    assert report.available_outputs() == ['xlsx', 'csv', 'ndjson']
+    with pytest.raises(ValueError, match='pyarrow'):
+        output_name('Apdoroti_Israsai_SEB.xlsx', 'parquet')
+    with pytest.raises(ValueError, match='pyarrow'):
+        write_report(tmp_path / 'a.parquet.zip', sample(), output='parquet')
+    assert not (tmp_path / 'a.parquet.zip').exists()
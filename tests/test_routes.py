@@ -211,3 +211,17 @@ def test_analyze_invalid_bank(client, app):
     assert response.status_code == 200
     assert b'error' in response.data or b'klaida' in response.data
 
+def test_index_offers_parquet_only_with_pyarrow(client, app, monkeypatch):
+    from sheetsift.models import User
+    from sheetsift import bcrypt, db
+    import sheetsift.report as report
+    hashed_pw = bcrypt.generate_password_hash('testpass').decode('utf-8')
+    with app.app_context():
+        db.session.add(User(id=19, username='testuser19', password=hashed_pw))
+        db.session.commit()
+    client.post('/login', data={'username': 'testuser19', 'password': 'testpass'})
+
+    monkeypatch.setattr(report, 'HAS_PYARROW', False)
+    assert b'value="parquet"' not in client.get('/').data
+    monkeypatch.setattr(report, 'HAS_PYARROW', True)
+    assert b'value="parquet"' in client.get('/').data
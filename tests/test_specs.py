@@ -0,0 +1,90 @@
+import re
+import pandas as pd
+import pytest
+from sheetsift.detection import build_index, detect_format
+from sheetsift.specs import compile_specs, build_transactions, resolve_field
+
+ACCOUNT_PATTERN = re.compile(r'(?P<account>LT\d{18})')
+
+SPECS = {
+    'naujas': {
+        'date': 'Data',
+        'dayfirst': True,
+        'account': {'column': 'Sąskaita', 'fill': 'Sąskaita nenurodyta'},
+        'counterparty': {'column': 'Kas', 'fill': 'Nenurodytas'},
+        'counterparty_account': {'column': 'Aprašymas', 'pattern': ACCOUNT_PATTERN, 'group': 'account',
+                                 'fallback': True},
+        'purpose': {'column': 'Aprašymas', 'fill': 'Be paskirties'},
+        'amount': {'indicator': 'Tipas', 'amount': 'Suma', 'credit': 'K', 'debit': 'D'},
+    },
+    'senas': {
+        'date': 'Data',
+        'counterparty': {'column': 'Kas'},
+        'amount': {'credit': 'Kreditas', 'debit': 'Debetas'},
+    },
+}
+
+def test_compile_specs_derives_header_and_dtypes():
+    formats, dtypes = compile_specs(SPECS)
+
+    assert formats == {
+        'naujas': ['Data', 'Sąskaita', 'Kas', 'Aprašymas', 'Suma', 'Tipas'],
+        'senas': ['Data', 'Kas', 'Kreditas', 'Debetas'],
+    }
+    # Extracted fields stay plain text
+    assert dtypes == {'Sąskaita': 'category', 'Kas': 'category', 'Tipas': 'category'}
+
+def test_compiled_formats_feed_detection():
+    formats, _ = compile_specs(SPECS)
+    index = build_index({'bankas': formats})
+
+    assert detect_format(['Kas', 'Data', 'Debetas', 'Kreditas', 'Kita'], index) == ('bankas', 'senas')
+
+def test_unknown_amount_convention_is_rejected():
+    with pytest.raises(ValueError):
+        compile_specs({'blogas': {'date': 'Data', 'amount': {'suma': 'Suma'}}})
+
+def test_build_transactions_from_spec():
+    df = pd.DataFrame({
+        'Data': ['05.02.2024', '2023-12-31', None],
+        'Sąskaita': ['LT99', None, 'LT99'],
+        'Kas': ['Jonas', None, 'Petras'],
+        'Aprašymas': ['Nuoma LT123456789012345678', 'Kortelė: Maxima', None],
+        'Suma': ['1 000,50', '12.30', '5'],
+        'Tipas': ['K', 'D', 'X'],
+    })
+
+    result = build_transactions(SPECS['naujas'], df)
+
+    assert result['METAI'].tolist() == [2024, 2023, pd.NA]
+    assert result['ASMENS SĄSKAITA'].tolist() == ['LT99', 'Sąskaita nenurodyta', 'LT99']
+    assert result['MOKĖTOJAS/GAVĖJAS'].tolist() == ['Jonas', 'Nenurodytas', 'Petras']
+    assert result['MOKĖTOJO/GAVĖJO SĄSKAITA'].tolist()[:2] == ['LT123456789012345678', 'Kortelė: Maxima']
+    assert result['MOKĖJIMO PASKIRTIS'].tolist()[2] == 'Be paskirties'
+    assert result['SUMA'].tolist() == [100050, -1230, pd.NA]
+
+def test_build_transactions_keeps_named_currencies():
+    df = pd.DataFrame({'Data': ['2024-01-05', '2024-01-06', '2024-01-07'],
+                       'Kas': ['Jonas', 'Petras', 'Ona'],
+                       'Kreditas': ['10,00 EUR', None, '5 USD'],
+                       'Debetas': [None, '€2,50', None]})
+
+    result = build_transactions(SPECS['senas'], df)
+
+    assert result['VALIUTA'].tolist() == ['EUR', 'EUR', 'USD']
+    assert result['SUMA'].tolist() == [1000, -250, 500]
+    # Plain numbers name no currency, and then there is no column
+    assert 'VALIUTA' not in build_transactions(SPECS['senas'], df.assign(Kreditas=[10.0, None, 5.0],
+                                                                          Debetas=[None, 2.5, None]))
+
+def test_resolve_field_shares_one_pass_per_pattern():
+    pattern = re.compile(r'(?P<vardas>\w+) (?P<numeris>\d+)')
+    df = pd.DataFrame({'Tekstas': ['Jonas 12', 'be numerio']})
+    extracted = {}
+
+    names = resolve_field({'column': 'Tekstas', 'pattern': pattern, 'group': 'vardas', 'fill': '-'}, df, extracted)
+    numbers = resolve_field({'column': 'Tekstas', 'pattern': pattern, 'group': 'numeris'}, df, extracted)
+
+    assert list(extracted) == [('Tekstas', pattern)]
+    assert names.tolist() == ['Jonas', '-']
+    assert numbers.tolist()[0] == '12' and pd.isna(numbers[1])
@@ -0,0 +1,192 @@
+import io
+import os
+import threading
+import time
+import pandas as pd
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+from sheetsift import create_app, db, bcrypt
+from sheetsift.models import User
+from sheetsift.uploads import SpooledRequest, map_uploads, run_in_pool
+
+def login(client, app, user_id=40):
+    hashed_pw = bcrypt.generate_password_hash('testpass').decode('utf-8')
+    with app.app_context():
+        db.session.add(User(id=user_id, username=f'testuser{user_id}', password=hashed_pw))
+        db.session.commit()
+    client.post('/login', data={'username': f'testuser{user_id}', 'password': 'testpass'})
+
+def test_app_uses_spooled_request(app):
+    assert app.request_class is SpooledRequest
+
+def test_small_upload_stays_in_memory(app):
+    data = {'file': (io.BytesIO(b'x' * 100), 'israsas.xlsx')}
+    with app.test_request_context('/analyze', method='POST', data=data):
+        from flask import request
+        stream = request.files['file'].stream
+        assert stream.read() == b'x' * 100
+        assert not stream._rolled
+
+def test_large_upload_spills_to_temporary_file(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'UPLOAD_FOLDER': str(tmp_path),
+        'UPLOAD_SPOOL_SIZE': 10,
+    }, testing=True)
+    data = {'file': (io.BytesIO(b'x' * 100), 'israsas.xlsx')}
+    with app.test_request_context('/analyze', method='POST', data=data):
+        from flask import request
+        stream = request.files['file'].stream
+        stream.seek(0)
+        assert stream._rolled
+        assert stream.read() == b'x' * 100
+        assert os.listdir(tmp_path) == []
+
+def test_analyze_does_not_save_upload_under_client_filename(client, app, tmp_path):
+    os.makedirs('tests/uploads', exist_ok=True)
+    os.makedirs('tests/results', exist_ok=True)
+    login(client, app)
+
+    df = pd.DataFrame({
+        'Nurašymo / įskaitymo data': ['2024-01-01'],
+        'Operacijos aprašymas': ['Mokėtojas: Jonas'],
+        'Suma sąskaitos valiuta': ['100,00'],
+    })
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    buffer.seek(0)
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        data = {'file': (buffer, 'kliento_failas.xlsx'), 'bank': 'seb'}
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+
+    assert response.status_code == 302
+    assert '/sekmingai' in response.location
+    assert not os.path.exists(os.path.join('tests/uploads', 'kliento_failas.xlsx'))
+
+def test_upload_is_hashed_while_streaming(app):
+    import hashlib
+    from sheetsift.uploads import upload_digest
+    content = b'israsas' * 1000
+    data = {'file': (io.BytesIO(content), 'israsas.xlsx')}
+    with app.test_request_context('/analyze', method='POST', data=data):
+        from flask import request
+        file = request.files['file']
+        assert file.stream.sha256.hexdigest() == hashlib.sha256(content).hexdigest()
+        assert upload_digest(file) == hashlib.sha256(content).hexdigest()
+
+def swedbank_statement(rows):
+    df = pd.DataFrame(rows, columns=['Data', 'Gavėjas / Siuntėjas', 'Operacijos tipas', 'Suma'])
+    df['Gavėjo / Siuntėjo sąskaitos nr.'] = 'LT01'
+    df['Sąskaitos Nr.'] = 'LT99'
+    df['Detalės'] = 'Mokėjimas'
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+def test_several_statements_make_one_report(client, app):
+    login(client, app, user_id=41)
+    january = swedbank_statement([
+        ['2024-01-05', 'Jonas', 'įplaukos', 100.0],
+        ['2024-01-05', 'Jonas', 'įplaukos', 100.0],
+        ['2024-02-10', 'Petras', 'išlaidos', 30.0],
+    ])
+    # Overlaps the first statement by the February payment
+    february = swedbank_statement([
+        ['2024-02-10', 'Petras', 'išlaidos', 30.0],
+        ['2024-03-01', 'Jonas', 'įplaukos', 50.0],
+    ])
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        data = {'file': [(january, 'sausis.xlsx'), (february, 'vasaris.xlsx')], 'bank': 'swedbank'}
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+
+    assert '/sekmingai' in response.location
+    with client.session_transaction() as session:
+        sheets = pd.read_excel(session['last_file'], sheet_name=None)
+    assert sheets['Pajamos'][2024].tolist() == [250]
+    assert sheets['Išlaidos'][2024].tolist() == [30]
+
+def test_old_and_new_seb_statements_make_one_report(client, app):
+    login(client, app, user_id=42)
+    old = pd.DataFrame({
+        'Nurašymo / įskaitymo data': ['2023-12-20'],
+        'Operacijos aprašymas': ['Mokėtojas: Jonas'],
+        'Suma sąskaitos valiuta': ['100,00'],
+    })
+    new = pd.DataFrame({
+        'DATA': ['2024-01-02'],
+        'MOKĖTOJO ARBA GAVĖJO PAVADINIMAS': ['Petras'],
+        'SĄSKAITA': ['LT01'],
+        'MOKĖJIMO PASKIRTIS': ['Nuoma'],
+        'SĄSKAITOS NR': ['LT99'],
+        'DEBETAS/KREDITAS': ['C'],
+        'SUMA': [250.0],
+    })
+    statements = []
+    for df in (old, new):
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        buffer.seek(0)
+        statements.append(buffer)
+
+    with patch('sheetsift.analysis.schedule_file_deletion'):
+        data = {'file': [(statements[0], 'senas.xlsx'), (statements[1], 'naujas.xlsx')], 'bank': 'seb'}
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+
+    assert '/sekmingai' in response.location
+    with client.session_transaction() as session:
+        sheets = pd.read_excel(session['last_file'], sheet_name=None)
+    # The old statement names no own account, but its income is still counted
+    assert sheets['Pajamos'][['ASMENS SĄSKAITA', 'MOKĖTOJAS', 2023, 2024]].values.tolist() == [
+        ['LT99', 'Petras', 0, 250], ['Sąskaita nenurodyta', 'Jonas', 100, 0]]
+    assert sheets['Bendra'].set_index(sheets['Bendra'].columns[0])['Viso'].to_dict() == {
+        'LT99 Bendros Pajamos': 250, 'LT99 Bendros Išlaidos': 0,
+        'Sąskaita nenurodyta Bendros Pajamos': 100, 'Sąskaita nenurodyta Bendros Išlaidos': 0}
+
+def test_map_uploads_keeps_order_in_app_context(app):
+    from flask import current_app
+
+    def job(name, number):
+        return name, number, current_app.name
+
+    with app.app_context():
+        assert map_uploads(job, [('a', 1), ('b', 2), ('c', 3)]) == [('a', 1, app.name), ('b', 2, app.name),
+                                                                  ('c', 3, app.name)]
+
+def test_map_uploads_uses_no_more_threads_than_parse_workers():
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'PARSE_WORKERS': 2,
+    }, testing=True)
+    threads = set()
+
+    def job(number):
+        threads.add(threading.get_ident())
+        time.sleep(0.05)
+        return number
+
+    with app.app_context():
+        assert map_uploads(job, [(number,) for number in range(6)]) == list(range(6))
+    app.extensions['parse_pool'].shutdown()
+
+    assert len(threads) == 2
+
+def test_broken_parse_pool_is_replaced():
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'PARSE_WORKERS': 1,
+    }, testing=True)
+    broken = app.extensions['parse_pool']
+
+    with app.app_context():
+        with pytest.raises(BrokenProcessPool):
+            run_in_pool(os._exit, 1)
+        assert app.extensions['parse_pool'] is not broken
+        assert run_in_pool(sum, [1, 2]) == 3
+    app.extensions['parse_pool'].shutdown()
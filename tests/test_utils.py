@@ -21,6 +21,18 @@ def test_schedule_file_deletion(tmp_path):
 
     assert not f.exists()
 
+def test_schedule_file_deletion_removes_empty_folder(tmp_path):
+    folder = tmp_path / "rezultatas"
+    folder.mkdir()
+    f = folder / "testfile.txt"
+    f.write_text("test")
+    schedule_file_deletion(str(f), delay=0, remove_folder=True)
+
+    import time
+    time.sleep(1)
+
+    assert not folder.exists()
+
 def test_cleanup_temp_files_handles_exception(monkeypatch, tmp_path):
     test_file = tmp_path / "testfile.txt"
     test_file.write_text("test")